@@ -0,0 +1,40 @@
+"""add order code sequence and counter
+
+Revision ID: 202410170900
+Revises: 202403041300
+Create Date: 2024-10-17 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202410170900"
+down_revision: Union[str, None] = "202403041300"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ORDER_CODE_BLOCK_SIZE = 100
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(sa.schema.CreateSequence(sa.Sequence("order_code_seq", start=1, increment=ORDER_CODE_BLOCK_SIZE)))
+
+    op.create_table(
+        "order_code_counter",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("next_value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("order_code_counter")
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(sa.schema.DropSequence(sa.Sequence("order_code_seq")))
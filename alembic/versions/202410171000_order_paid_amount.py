@@ -0,0 +1,44 @@
+"""add running paid amount to orders
+
+Revision ID: 202410171000
+Revises: 202410170900
+Create Date: 2024-10-17 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202410171000"
+down_revision: Union[str, None] = "202410170900"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "orders",
+        sa.Column("paid_amount", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+    )
+    # Opening deposit (deposit not backed by DEPOSIT payments) plus the net of REMAINING and REFUND payments.
+    op.execute(
+        """
+        UPDATE orders SET paid_amount = deposit_amount + COALESCE(
+            (
+                SELECT SUM(CASE payments.type WHEN 'REMAINING' THEN payments.amount
+                                              WHEN 'REFUND' THEN -payments.amount
+                                              ELSE 0 END)
+                FROM payments
+                WHERE payments.order_id = orders.id
+            ),
+            0
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("orders", "paid_amount")
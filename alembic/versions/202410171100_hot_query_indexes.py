@@ -0,0 +1,61 @@
+"""add indexes for order and customer listing, scheduling and foreign keys
+
+Revision ID: 202410171100
+Revises: 202410171000
+Create Date: 2024-10-17 11:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202410171100"
+down_revision: Union[str, None] = "202410171000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+OPEN_ORDER_CONDITION = "status NOT IN ('COMPLETED', 'CANCELLED')"
+
+INDEXES = [
+    ("ix_orders_created_at_id", "orders", ["created_at", "id"], None),
+    ("ix_orders_status_created_at_id", "orders", ["status", "created_at", "id"], None),
+    ("ix_orders_receive_at", "orders", ["receive_at"], None),
+    ("ix_orders_open_receive_at", "orders", ["receive_at"], OPEN_ORDER_CONDITION),
+    ("ix_orders_customer_id", "orders", ["customer_id"], None),
+    ("ix_customers_created_at", "customers", ["created_at"], None),
+    ("ix_order_items_order_id", "order_items", ["order_id"], None),
+    ("ix_order_items_sku_id", "order_items", ["sku_id"], None),
+    ("ix_payments_order_id", "payments", ["order_id"], None),
+    ("ix_assignments_order_id", "assignments", ["order_id"], None),
+    ("ix_assignments_assignee_id", "assignments", ["assignee_id"], None),
+    ("ix_sku_bom_parent_sku_id", "sku_bom", ["parent_sku_id"], None),
+    ("ix_sku_bom_component_sku_id", "sku_bom", ["component_sku_id"], None),
+    ("ix_sku_aliases_sku_id", "sku_aliases", ["sku_id"], None),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the tables writable while PostgreSQL builds the indexes,
+    # but it cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            condition = sa.text(where) if where else None
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=condition,
+                sqlite_where=condition,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
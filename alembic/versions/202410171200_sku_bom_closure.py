@@ -0,0 +1,54 @@
+"""add precomputed BOM closure for multi-level explosion
+
+Revision ID: 202410171200
+Revises: 202410171100
+Create Date: 2024-10-17 12:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202410171200"
+down_revision: Union[str, None] = "202410171100"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sku_bom_closure",
+        sa.Column("ancestor_sku_id", sa.Integer(), sa.ForeignKey("skus.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("descendant_sku_id", sa.Integer(), sa.ForeignKey("skus.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("qty", sa.Numeric(18, 6), nullable=False),
+        sa.Column("is_leaf", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("ancestor_sku_id", "descendant_sku_id"),
+    )
+    op.create_index("ix_sku_bom_closure_descendant_sku_id", "sku_bom_closure", ["descendant_sku_id"], unique=False)
+    # Quantities multiply along each path and add up across paths; the depth cap stops
+    # the walk if the existing data already contains a cycle.
+    op.execute(
+        """
+        INSERT INTO sku_bom_closure (ancestor_sku_id, descendant_sku_id, qty, is_leaf)
+        WITH RECURSIVE paths (ancestor_sku_id, descendant_sku_id, qty, depth) AS (
+            SELECT parent_sku_id, component_sku_id, CAST(qty AS NUMERIC(18, 6)), 1 FROM sku_bom
+            UNION ALL
+            SELECT paths.ancestor_sku_id, sku_bom.component_sku_id,
+                   CAST(paths.qty * sku_bom.qty AS NUMERIC(18, 6)), paths.depth + 1
+            FROM paths JOIN sku_bom ON sku_bom.parent_sku_id = paths.descendant_sku_id
+            WHERE paths.depth < 32
+        )
+        SELECT ancestor_sku_id, descendant_sku_id, SUM(qty),
+               NOT EXISTS (SELECT 1 FROM sku_bom WHERE sku_bom.parent_sku_id = paths.descendant_sku_id)
+        FROM paths
+        GROUP BY ancestor_sku_id, descendant_sku_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sku_bom_closure_descendant_sku_id", table_name="sku_bom_closure")
+    op.drop_table("sku_bom_closure")
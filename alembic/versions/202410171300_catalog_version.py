@@ -0,0 +1,32 @@
+"""add catalog version counter for per-worker catalog caches
+
+Revision ID: 202410171300
+Revises: 202410171200
+Create Date: 2024-10-17 13:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202410171300"
+down_revision: Union[str, None] = "202410171200"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    table = op.create_table(
+        "catalog_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.bulk_insert(table, [{"id": 1, "version": 1}])
+
+
+def downgrade() -> None:
+    op.drop_table("catalog_version")
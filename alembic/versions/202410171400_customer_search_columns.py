@@ -0,0 +1,87 @@
+"""add normalized customer search columns with trigram indexes
+
+Revision ID: 202410171400
+Revises: 202410171300
+Create Date: 2024-10-17 14:00:00.000000
+"""
+
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202410171400"
+down_revision: Union[str, None] = "202410171300"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+# Frozen copy of app.core.text as of this revision.
+def _fold(value: str) -> str:
+    decomposed = unicodedata.normalize("NFD", value.lower().replace("đ", "d"))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return re.sub(r"[^0-9a-z]+", " ", stripped).strip()
+
+
+def _digits(value: str) -> str:
+    return re.sub(r"\D+", "", value)
+
+
+def upgrade() -> None:
+    op.add_column("customers", sa.Column("name_folded", sa.String(255), server_default="", nullable=False))
+    op.add_column("customers", sa.Column("phone_digits", sa.String(32), server_default="", nullable=False))
+
+    connection = op.get_bind()
+    customers = sa.table(
+        "customers", sa.column("id"), sa.column("name"), sa.column("phone"), sa.column("name_folded"), sa.column("phone_digits")
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(customers.c.id, customers.c.name, customers.c.phone)
+            .where(customers.c.id > last_id)
+            .order_by(customers.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            customers.update()
+            .where(customers.c.id == sa.bindparam("row_id"))
+            .values(name_folded=sa.bindparam("folded"), phone_digits=sa.bindparam("digits")),
+            [{"row_id": row.id, "folded": _fold(row.name), "digits": _digits(row.phone)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.create_index("ix_customers_phone_digits", "customers", ["phone_digits"], unique=False)
+    if connection.dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_customers_name_folded_trgm",
+            "customers",
+            ["name_folded"],
+            postgresql_using="gin",
+            postgresql_ops={"name_folded": "gin_trgm_ops"},
+        )
+        op.create_index(
+            "ix_customers_phone_digits_trgm",
+            "customers",
+            ["phone_digits"],
+            postgresql_using="gin",
+            postgresql_ops={"phone_digits": "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_customers_phone_digits_trgm", table_name="customers")
+        op.drop_index("ix_customers_name_folded_trgm", table_name="customers")
+    op.drop_index("ix_customers_phone_digits", table_name="customers")
+    op.drop_column("customers", "phone_digits")
+    op.drop_column("customers", "name_folded")
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.db.models.users import User, UserRole
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """The slice of a user needed to authenticate and authorize a request."""
+
+    id: int
+    name: str
+    role: UserRole
+    is_active: bool
+
+
+class UserCache:
+    """Bounded per-process cache of authenticated users keyed by token subject.
+
+    Entries expire after a short TTL so changes made by other workers are picked
+    up, and are dropped as soon as a committed session in this process writes
+    the user row.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self._entries: dict[str, tuple[float, AuthenticatedUser]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> AuthenticatedUser | None:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[subject]
+                return None
+            return user
+
+    def set(self, subject: str, user: AuthenticatedUser, ttl_seconds: float) -> None:
+        if ttl_seconds <= 0:
+            return
+        with self._lock:
+            if subject not in self._entries and len(self._entries) >= self.maxsize:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[subject] = (time.monotonic() + ttl_seconds, user)
+
+    def invalidate(self, subjects: set[str]) -> None:
+        with self._lock:
+            for subject in subjects:
+                self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_users(session: Session, flush_context: object) -> None:
+    names: set[str] | None = None
+    for instance in (*session.dirty, *session.deleted):
+        if not isinstance(instance, User):
+            continue
+        if names is None:
+            names = session.info.setdefault("written_users", set())
+        # Include the previous name so a renamed user's old subject is dropped too.
+        history = inspect(instance).attrs.name.history
+        names.update(name for name in (instance.name, *history.deleted) if name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_written_users(session: Session) -> None:
+    names = session.info.pop("written_users", None)
+    if names:
+        user_cache.invalidate(names)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_users(session: Session) -> None:
+    session.info.pop("written_users", None)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from sqlalchemy import Connection, Numeric, cast, delete, event, exists, func, insert, inspect, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.catalog import bump_catalog_version
+from app.db.models.skus import SkuBom, SkuBomClosure
+
+CLOSURE_QTY = Numeric(18, 6)
+QTY_QUANTUM = Decimal("0.000001")
+# Guards the rebuild against cycles that slipped into the data before closure maintenance existed.
+MAX_BOM_DEPTH = 32
+
+
+class BomCycleError(ValueError):
+    pass
+
+
+def _has_bom(connection: Connection, sku_id: int) -> bool:
+    return connection.execute(select(exists().where(SkuBom.parent_sku_id == sku_id))).scalar_one()
+
+
+def _upsert(connection: Connection, rows: list[dict]) -> None:
+    insert_factory = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    stmt = insert_factory(SkuBomClosure)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SkuBomClosure.ancestor_sku_id, SkuBomClosure.descendant_sku_id],
+        set_={"qty": SkuBomClosure.qty + stmt.excluded.qty},
+    )
+    connection.execute(stmt, rows)
+
+
+def ensure_no_cycle(connection: Connection, parent_sku_id: int, component_sku_id: int) -> None:
+    """Raise BomCycleError if making ``component_sku_id`` part of ``parent_sku_id`` would close a loop."""
+    if parent_sku_id == component_sku_id:
+        raise BomCycleError("A SKU cannot be a component of itself")
+    reaches_parent = connection.execute(
+        select(
+            exists().where(
+                SkuBomClosure.ancestor_sku_id == component_sku_id,
+                SkuBomClosure.descendant_sku_id == parent_sku_id,
+            )
+        )
+    ).scalar_one()
+    if reaches_parent:
+        raise BomCycleError("Component already contains this SKU, which would create a BOM cycle")
+
+
+def apply_bom_edge(connection: Connection, parent_sku_id: int, component_sku_id: int, qty_delta: Decimal) -> None:
+    """Add (or, with a negative delta, remove) one BOM edge's contribution to the closure.
+
+    Every ancestor of the parent gains ``ancestor->parent * delta * component->descendant``
+    of each descendant of the component, counting the parent and component themselves
+    with a factor of one. Quantities along different paths simply add up, so the
+    update is exact for shared sub-assemblies as well.
+    """
+    ancestors = [(parent_sku_id, Decimal(1))] + [
+        (row.ancestor_sku_id, row.qty)
+        for row in connection.execute(
+            select(SkuBomClosure.ancestor_sku_id, SkuBomClosure.qty).where(
+                SkuBomClosure.descendant_sku_id == parent_sku_id
+            )
+        )
+    ]
+    descendants = [(component_sku_id, Decimal(1), not _has_bom(connection, component_sku_id))] + [
+        (row.descendant_sku_id, row.qty, row.is_leaf)
+        for row in connection.execute(
+            select(SkuBomClosure.descendant_sku_id, SkuBomClosure.qty, SkuBomClosure.is_leaf).where(
+                SkuBomClosure.ancestor_sku_id == component_sku_id
+            )
+        )
+    ]
+    _upsert(
+        connection,
+        [
+            {
+                "ancestor_sku_id": ancestor_id,
+                "descendant_sku_id": descendant_id,
+                "qty": (ancestor_qty * qty_delta * descendant_qty).quantize(QTY_QUANTUM),
+                "is_leaf": is_leaf,
+            }
+            for ancestor_id, ancestor_qty in ancestors
+            for descendant_id, descendant_qty, is_leaf in descendants
+        ],
+    )
+    if qty_delta < 0:
+        connection.execute(
+            delete(SkuBomClosure).where(
+                SkuBomClosure.ancestor_sku_id.in_([ancestor_id for ancestor_id, _ in ancestors]),
+                SkuBomClosure.qty <= 0,
+            )
+        )
+
+
+def refresh_leaf_flags(connection: Connection, sku_ids: set[int]) -> None:
+    for sku_id in sku_ids:
+        connection.execute(
+            update(SkuBomClosure)
+            .where(SkuBomClosure.descendant_sku_id == sku_id)
+            .values(is_leaf=not _has_bom(connection, sku_id))
+        )
+
+
+def rebuild_bom_closure(connection: Connection) -> None:
+    """Recompute the whole closure from sku_bom, e.g. after a bulk load that bypassed the ORM."""
+    paths = (
+        select(
+            SkuBom.parent_sku_id.label("ancestor_sku_id"),
+            SkuBom.component_sku_id.label("descendant_sku_id"),
+            cast(SkuBom.qty, CLOSURE_QTY).label("qty"),
+            literal(1).label("depth"),
+        )
+        .cte("paths", recursive=True)
+    )
+    paths = paths.union_all(
+        select(
+            paths.c.ancestor_sku_id,
+            SkuBom.component_sku_id,
+            cast(paths.c.qty * SkuBom.qty, CLOSURE_QTY),
+            paths.c.depth + 1,
+        )
+        .join(SkuBom, SkuBom.parent_sku_id == paths.c.descendant_sku_id)
+        .where(paths.c.depth < MAX_BOM_DEPTH)
+    )
+    connection.execute(delete(SkuBomClosure))
+    connection.execute(
+        insert(SkuBomClosure).from_select(
+            ["ancestor_sku_id", "descendant_sku_id", "qty", "is_leaf"],
+            select(
+                paths.c.ancestor_sku_id,
+                paths.c.descendant_sku_id,
+                func.sum(paths.c.qty),
+                ~exists().where(SkuBom.parent_sku_id == paths.c.descendant_sku_id),
+            ).group_by(paths.c.ancestor_sku_id, paths.c.descendant_sku_id),
+        )
+    )
+    bump_catalog_version(connection)
+
+
+@event.listens_for(Session, "before_flush")
+def _remember_bom_edges(session: Session, flush_context: object, instances: object) -> None:
+    # Old edge values come from the database while it still has them: an expired or
+    # deleted instance carries no attribute history to read them from after the flush.
+    ids = [
+        inspect(instance).identity[0]
+        for instance in (*session.dirty, *session.deleted)
+        if isinstance(instance, SkuBom) and inspect(instance).has_identity
+    ]
+    if not ids:
+        session.info.pop("bom_edges_before_flush", None)
+        return
+    rows = session.connection().execute(
+        select(SkuBom.id, SkuBom.parent_sku_id, SkuBom.component_sku_id, SkuBom.qty).where(SkuBom.id.in_(ids))
+    )
+    session.info["bom_edges_before_flush"] = {
+        row.id: (row.parent_sku_id, row.component_sku_id, row.qty) for row in rows
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_bom_closure(session: Session, flush_context: object) -> None:
+    before: dict[int, tuple[int, int, Decimal]] = session.info.pop("bom_edges_before_flush", {})
+    removed: list[tuple[int, int, Decimal]] = []
+    added: list[tuple[int, int, Decimal]] = []
+    for instance in session.deleted:
+        if isinstance(instance, SkuBom) and (old := before.get(inspect(instance).identity[0])) is not None:
+            removed.append(old)
+    for instance in session.new:
+        if isinstance(instance, SkuBom):
+            added.append((instance.parent_sku_id, instance.component_sku_id, instance.qty))
+    for instance in session.dirty:
+        if not isinstance(instance, SkuBom):
+            continue
+        old = before.get(inspect(instance).identity[0])
+        new = (instance.parent_sku_id, instance.component_sku_id, Decimal(instance.qty))
+        if old is None or old == new:
+            continue
+        removed.append(old)
+        added.append(new)
+    if not removed and not added:
+        return
+
+    connection = session.connection()
+    for parent_id, component_id, qty in removed:
+        apply_bom_edge(connection, parent_id, component_id, -Decimal(qty))
+    for parent_id, component_id, qty in added:
+        ensure_no_cycle(connection, parent_id, component_id)
+        apply_bom_edge(connection, parent_id, component_id, Decimal(qty))
+    refresh_leaf_flags(connection, {parent_id for parent_id, _, _ in (*removed, *added)})
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from functools import cached_property
+
+from sqlalchemy import Connection, event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.sku_resolver import SkuResolver
+from app.db.models.skus import CatalogVersion, Sku, SkuAlias, SkuBom, SkuBomClosure
+
+CATALOG_MODELS = (Sku, SkuAlias, SkuBom)
+# A load that sees rows of a catalog write committed mid-load starts over this many times.
+CATALOG_LOAD_ATTEMPTS = 3
+# The scale of sku_bom.qty, so exploded quantities read like the edge quantities they come from.
+BOM_QTY_QUANTUM = Decimal("0.001")
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSku:
+    id: int
+    code: str
+    name: str
+    is_template: bool
+    unit: str | None
+    track_stock: bool
+    base_price: int
+    options_json: dict | None
+    is_active: bool
+    created_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogAlias:
+    id: int
+    sku_id: int
+    alias: str
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogBomLine:
+    id: int
+    component_sku_id: int
+    component_code: str
+    component_name: str
+    qty: Decimal
+    uom: str | None
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """Immutable snapshot of the SKU catalog as of ``version``."""
+
+    version: int
+    skus: dict[int, CatalogSku]
+    # Newest first, the order list_skus has always used.
+    newest_first: tuple[CatalogSku, ...]
+    aliases: dict[int, tuple[CatalogAlias, ...]]
+    bom: dict[int, tuple[CatalogBomLine, ...]]
+    # Leaf components with effective quantities from sku_bom_closure, in order snapshot form.
+    exploded: dict[int, tuple[dict, ...]]
+
+    @cached_property
+    def resolver(self) -> SkuResolver:
+        # Built on first use, so reloads driven by order intake do not pay for it.
+        entries = [(sku.id, "code", sku.code) for sku in self.skus.values()]
+        entries += [(sku.id, "name", sku.name) for sku in self.skus.values()]
+        entries += [(alias.sku_id, "alias", alias.alias) for rows in self.aliases.values() for alias in rows]
+        return SkuResolver(entries)
+
+    def bom_snapshot(self, sku_id: int) -> list[dict]:
+        # Copies, so callers can hand the lines to the ORM without sharing them between orders.
+        return [dict(line) for line in self.exploded.get(sku_id, ())]
+
+
+def bump_catalog_version(connection: Connection) -> None:
+    insert_factory = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    stmt = insert_factory(CatalogVersion).values(id=1, version=1)
+    connection.execute(
+        stmt.on_conflict_do_update(index_elements=[CatalogVersion.id], set_={"version": CatalogVersion.version + 1})
+    )
+
+
+class CatalogChangedError(RuntimeError):
+    """A catalog write committed between the statements of one catalog load."""
+
+
+def _known_sku(skus: dict[int, CatalogSku], sku_id: int) -> CatalogSku:
+    # Each statement of a load sees the latest commit under READ COMMITTED, so BOM rows
+    # can name a SKU that was committed after the SKU rows were read.
+    sku = skus.get(sku_id)
+    if sku is None:
+        raise CatalogChangedError(f"SKU {sku_id} appeared while the catalog was loading")
+    return sku
+
+
+async def _read_version(db: AsyncSession) -> int:
+    version = await db.scalar(select(CatalogVersion.version).where(CatalogVersion.id == 1))
+    return version or 0
+
+
+async def _load_catalog(db: AsyncSession, version: int) -> Catalog:
+    sku_rows = await db.execute(
+        select(
+            Sku.id,
+            Sku.code,
+            Sku.name,
+            Sku.is_template,
+            Sku.unit,
+            Sku.track_stock,
+            Sku.base_price,
+            Sku.options_json,
+            Sku.is_active,
+            Sku.created_at,
+        )
+    )
+    skus = {row.id: CatalogSku(**row._mapping) for row in sku_rows}
+    newest_first = tuple(sorted(skus.values(), key=lambda sku: (sku.created_at, sku.id), reverse=True))
+
+    aliases: dict[int, list[CatalogAlias]] = defaultdict(list)
+    for row in await db.execute(select(SkuAlias.id, SkuAlias.sku_id, SkuAlias.alias).order_by(SkuAlias.id)):
+        aliases[row.sku_id].append(CatalogAlias(**row._mapping))
+
+    bom: dict[int, list[CatalogBomLine]] = defaultdict(list)
+    bom_rows = await db.execute(
+        select(SkuBom.id, SkuBom.parent_sku_id, SkuBom.component_sku_id, SkuBom.qty, SkuBom.uom).order_by(SkuBom.id)
+    )
+    for row in bom_rows:
+        component = _known_sku(skus, row.component_sku_id)
+        bom[row.parent_sku_id].append(
+            CatalogBomLine(
+                id=row.id,
+                component_sku_id=component.id,
+                component_code=component.code,
+                component_name=component.name,
+                qty=row.qty,
+                uom=row.uom,
+            )
+        )
+
+    # A leaf reached only through one direct edge is snapshotted exactly as that edge, as
+    # order snapshots always were; leaves of sub-assemblies have no single edge uom.
+    direct: dict[tuple[int, int], list[CatalogBomLine]] = defaultdict(list)
+    for parent_id, lines in bom.items():
+        for line in lines:
+            direct[parent_id, line.component_sku_id].append(line)
+
+    exploded: dict[int, list[dict]] = defaultdict(list)
+    leaf_rows = await db.execute(
+        select(SkuBomClosure.ancestor_sku_id, SkuBomClosure.descendant_sku_id, SkuBomClosure.qty)
+        .where(SkuBomClosure.is_leaf.is_(True))
+        .order_by(SkuBomClosure.ancestor_sku_id, SkuBomClosure.descendant_sku_id)
+    )
+    for ancestor_id, descendant_id, qty in leaf_rows:
+        component = _known_sku(skus, descendant_id)
+        edges = direct.get((ancestor_id, descendant_id), [])
+        if len(edges) == 1 and edges[0].qty == qty:
+            qty, uom = edges[0].qty, edges[0].uom
+        else:
+            quantized = qty.quantize(BOM_QTY_QUANTUM)
+            qty, uom = (quantized if quantized == qty else qty), component.unit
+        exploded[ancestor_id].append(
+            {
+                "component_sku_id": component.id,
+                "component_code": component.code,
+                "component_name": component.name,
+                "qty": str(qty),
+                "uom": uom,
+            }
+        )
+
+    return Catalog(
+        version=version,
+        skus=skus,
+        newest_first=newest_first,
+        aliases={sku_id: tuple(rows) for sku_id, rows in aliases.items()},
+        bom={sku_id: tuple(rows) for sku_id, rows in bom.items()},
+        exploded={sku_id: tuple(rows) for sku_id, rows in exploded.items()},
+    )
+
+
+class CatalogCache:
+    """Per-process read-through cache of the whole SKU catalog.
+
+    Each read costs one primary-key lookup of the catalog version; the catalog is
+    reloaded only when another transaction has committed a catalog write since.
+    """
+
+    def __init__(self) -> None:
+        self._catalog: Catalog | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, db: AsyncSession) -> Catalog:
+        # Read the version before the rows: a concurrent write can then only make
+        # the loaded catalog newer than its version, which costs one extra reload.
+        version = await _read_version(db)
+        catalog = self._catalog
+        if catalog is not None and catalog.version == version:
+            with self._lock:
+                self.hits += 1
+            return catalog
+        with self._lock:
+            self.misses += 1
+        for attempt in range(CATALOG_LOAD_ATTEMPTS):
+            try:
+                catalog = await _load_catalog(db, version)
+                break
+            except CatalogChangedError:
+                if attempt == CATALOG_LOAD_ATTEMPTS - 1:
+                    raise
+                # The write that got in the way has committed its version bump too.
+                version = await _read_version(db)
+        with self._lock:
+            if self._catalog is None or self._catalog.version <= version:
+                self._catalog = catalog
+        return catalog
+
+    def stats(self) -> dict[str, int | None]:
+        with self._lock:
+            catalog = self._catalog
+            return {
+                "version": catalog.version if catalog else None,
+                "skus": len(catalog.skus) if catalog else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._catalog = None
+            self.hits = 0
+            self.misses = 0
+
+
+catalog_cache = CatalogCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_catalog_version(session: Session, flush_context: object) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, CATALOG_MODELS):
+            bump_catalog_version(session.connection())
+            return
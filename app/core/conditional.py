@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, status
+from fastapi.responses import Response
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive values for timezone-aware columns; they are stored in UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class ResourceVersion:
+    """Validators for a resource: a weak ETag over its version parts and a Last-Modified time."""
+
+    def __init__(self, *parts: object, last_modified: datetime | None) -> None:
+        digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+        self.etag = f'W/"{digest}"'
+        self.last_modified = _as_utc(last_modified).replace(microsecond=0) if last_modified else None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """Whether the client's cached copy is current, so a 304 can be sent.
+
+        If-None-Match takes precedence over If-Modified-Since, and ETags are
+        compared weakly.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return self.etag.removeprefix("W/") in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return self.last_modified <= _as_utc(since)
+
+    def not_modified(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
@@ -9,6 +9,16 @@ class Settings(BaseSettings):
     database_url: str = Field(..., alias="DATABASE_URL")
     jwt_secret: str = Field(..., alias="JWT_SECRET")
     jwt_expires_min: int = Field(60, alias="JWT_EXPIRES_MIN")
+    # Keys the order code permutation. Deliberately separate from JWT_SECRET: rotating it on a
+    # live database maps new counter values onto codes already issued.
+    order_code_secret: str = Field(..., alias="ORDER_CODE_SECRET")
+    count_cache_ttl_seconds: int = Field(30, alias="COUNT_CACHE_TTL_SECONDS")
+    # Upper bound on how long another worker can keep honouring a deactivated user or old role.
+    auth_cache_ttl_seconds: int = Field(60, alias="AUTH_CACHE_TTL_SECONDS")
+    bcrypt_rounds: int = Field(12, alias="BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(2, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_pending: int = Field(64, alias="PASSWORD_HASH_MAX_PENDING")
+    password_hash_timeout_seconds: float = Field(5.0, alias="PASSWORD_HASH_TIMEOUT_SECONDS")
     cors_origins: List[str] = Field(default_factory=lambda: ["*"], alias="CORS_ORIGINS")
 
     model_config = {
@@ -35,3 +45,17 @@ def get_settings() -> Settings:
 
 def get_database_url() -> str:
     return get_settings().database_url
+
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(url: str | None = None) -> str:
+    url = url or get_database_url()
+    scheme, separator, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
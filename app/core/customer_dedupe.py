@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core import text
+from app.db.models.customers import Customer
+from app.db.models.orders import Order
+
+_LINK_PREFIX = re.compile(r"^(?:https?://)?(?:www\.)?")
+# A link on more customers than this is a shop page or a placeholder, not one person's profile.
+MAX_LINK_GROUP = 20
+
+
+@dataclass(frozen=True)
+class DedupeReport:
+    clusters: int
+    merged_customers: int
+    moved_orders: int
+    normalized_phones: int
+
+
+def _link_key(social_link: str | None) -> str | None:
+    if not social_link:
+        return None
+    key = _LINK_PREFIX.sub("", social_link.strip().lower()).rstrip("/")
+    return key or None
+
+
+def name_similarity(left: str, right: str) -> float:
+    """Jaccard similarity of the trigram sets of two folded names."""
+    left_grams, right_grams = text.trigrams(left), text.trigrams(right)
+    if not left_grams or not right_grams:
+        return 0.0
+    return len(left_grams & right_grams) / len(left_grams | right_grams)
+
+
+def find_duplicate_clusters(
+    db: Session, name_threshold: float = 0.6, scan_batch: int = 10000, max_link_group: int = MAX_LINK_GROUP
+) -> list[list[int]]:
+    """Group customers that are probably the same person.
+
+    Two rows are linked when their phones normalize to the same number, or when
+    they share a social link and their folded names are at least
+    ``name_threshold`` similar. Names alone are never enough, since common
+    names repeat across many real customers. Links shared by more than
+    ``max_link_group`` rows are ignored, which also keeps the pairwise name
+    comparison bounded. Each cluster is returned sorted by id; the oldest row
+    is the one that survives a merge.
+    """
+    parent: dict[int, int] = {}
+
+    def find(customer_id: int) -> int:
+        root = customer_id
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while customer_id != root:
+            parent[customer_id], customer_id = root, parent.get(customer_id, customer_id)
+        return root
+
+    def union(left: int, right: int) -> None:
+        left, right = find(left), find(right)
+        if left != right:
+            parent[max(left, right)] = min(left, right)
+
+    by_phone: dict[str, int] = {}
+    by_link: dict[str, list[tuple[int, str]]] = defaultdict(list)
+    after_id = 0
+    while True:
+        rows = db.execute(
+            select(Customer.id, Customer.phone, Customer.name_folded, Customer.social_link)
+            .where(Customer.id > after_id)
+            .order_by(Customer.id)
+            .limit(scan_batch)
+        ).all()
+        if not rows:
+            break
+        for customer_id, phone, name_folded, social_link in rows:
+            phone_key = text.canonical_phone(phone)
+            if phone_key in by_phone:
+                union(by_phone[phone_key], customer_id)
+            else:
+                by_phone[phone_key] = customer_id
+            link_key = _link_key(social_link)
+            if link_key is not None:
+                by_link[link_key].append((customer_id, name_folded))
+        after_id = rows[-1].id
+
+    for members in by_link.values():
+        if len(members) > max_link_group:
+            continue
+        for index, (customer_id, name_folded) in enumerate(members):
+            for other_id, other_name in members[:index]:
+                if name_similarity(name_folded, other_name) >= name_threshold:
+                    union(other_id, customer_id)
+
+    clusters: dict[int, list[int]] = defaultdict(list)
+    for customer_id in parent:
+        clusters[find(customer_id)].append(customer_id)
+    return sorted(sorted({root, *members}) for root, members in clusters.items())
+
+
+def _move_orders(db: Session, survivors: dict[int, int], batch_size: int | None) -> int:
+    """Re-point orders of merged customers, committing every ``batch_size`` rows."""
+    moved = 0
+    new_customer = case(survivors, value=Order.customer_id)
+    while True:
+        stmt = update(Order).values(customer_id=new_customer)
+        if batch_size is None:
+            stmt = stmt.where(Order.customer_id.in_(survivors))
+        else:
+            batch = select(Order.id).where(Order.customer_id.in_(survivors)).limit(batch_size).scalar_subquery()
+            stmt = stmt.where(Order.id.in_(batch))
+        result = db.execute(stmt, execution_options={"synchronize_session": False})
+        moved += result.rowcount
+        if batch_size is None:
+            return moved
+        db.commit()
+        if result.rowcount < batch_size:
+            return moved
+
+
+def _merge_group(db: Session, clusters: list[list[int]], batch_size: int) -> tuple[int, int]:
+    survivors = {duplicate: cluster[0] for cluster in clusters for duplicate in cluster[1:]}
+    moved = _move_orders(db, survivors, batch_size)
+
+    # Orders placed for a duplicate since the batches ran are few; move them in the same
+    # transaction as the delete so the foreign key never sees them orphaned.
+    moved += _move_orders(db, survivors, None)
+    rows = db.execute(
+        select(Customer.id, Customer.social_link, Customer.notes).where(
+            Customer.id.in_([customer_id for cluster in clusters for customer_id in cluster])
+        )
+    ).all()
+    by_id = {row.id: row for row in rows}
+    db.execute(delete(Customer).where(Customer.id.in_(survivors)), execution_options={"synchronize_session": False})
+    for cluster in clusters:
+        survivor, duplicates = by_id[cluster[0]], [by_id[customer_id] for customer_id in cluster[1:]]
+        notes = [row.notes for row in (survivor, *duplicates) if row.notes]
+        social_link = survivor.social_link or next((row.social_link for row in duplicates if row.social_link), None)
+        db.execute(
+            update(Customer)
+            .where(Customer.id == survivor.id)
+            .values(social_link=social_link, notes="\n".join(dict.fromkeys(notes)) or None),
+            execution_options={"synchronize_session": False},
+        )
+    db.commit()
+    return len(survivors), moved
+
+
+def merge_customer_clusters(db: Session, clusters: list[list[int]], batch_size: int = 1000) -> tuple[int, int]:
+    """Merge each cluster into its first (oldest) customer; returns (merged rows, moved orders).
+
+    Orders move in set-based batches of at most ``batch_size`` rows per
+    transaction. The duplicate rows of about ``batch_size`` customers are then
+    deleted, and their survivors updated, in one short transaction.
+    """
+    merged = moved = 0
+    group: list[list[int]] = []
+    group_size = 0
+    for cluster in clusters:
+        if len(cluster) < 2:
+            continue
+        group.append(cluster)
+        group_size += len(cluster) - 1
+        if group_size >= batch_size:
+            merged_now, moved_now = _merge_group(db, group, batch_size)
+            merged, moved = merged + merged_now, moved + moved_now
+            group, group_size = [], 0
+    if group:
+        merged_now, moved_now = _merge_group(db, group, batch_size)
+        merged, moved = merged + merged_now, moved + moved_now
+    return merged, moved
+
+
+def normalize_customer_phones(db: Session, batch_size: int = 1000) -> int:
+    """Rewrite phones in national digits-only form, one id range per transaction.
+
+    Rows whose normalized phone is already taken are left alone; they are
+    duplicates that the merge step has not been allowed to fold in.
+    """
+    normalized = 0
+    after_id = 0
+    while True:
+        rows = db.execute(
+            select(Customer.id, Customer.phone).where(Customer.id > after_id).order_by(Customer.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return normalized
+        changes = {row.id: text.canonical_phone(row.phone) for row in rows}
+        changes = {row.id: changes[row.id] for row in rows if changes[row.id] != row.phone}
+        if changes:
+            taken = set(db.scalars(select(Customer.phone).where(Customer.phone.in_(changes.values()))))
+            for customer_id, phone in changes.items():
+                if phone in taken:
+                    continue
+                db.execute(
+                    update(Customer)
+                    .where(Customer.id == customer_id)
+                    .values(phone=phone, phone_digits=text.phone_digits(phone)),
+                    execution_options={"synchronize_session": False},
+                )
+                taken.add(phone)
+                normalized += 1
+        db.commit()
+        after_id = rows[-1].id
+
+
+def dedupe_customers(
+    db: Session, name_threshold: float = 0.6, batch_size: int = 1000, dry_run: bool = False
+) -> tuple[DedupeReport, list[list[int]]]:
+    clusters = find_duplicate_clusters(db, name_threshold=name_threshold)
+    db.rollback()
+    if dry_run:
+        report = DedupeReport(clusters=len(clusters), merged_customers=0, moved_orders=0, normalized_phones=0)
+        return report, clusters
+    merged, moved = merge_customer_clusters(db, clusters, batch_size=batch_size)
+    normalized = normalize_customer_phones(db, batch_size=batch_size)
+    report = DedupeReport(
+        clusters=len(clusters), merged_customers=merged, moved_orders=moved, normalized_phones=normalized
+    )
+    return report, clusters
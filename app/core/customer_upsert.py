@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Protocol
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql.dml import Insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import text
+from app.db.models.customers import Customer
+
+
+class CustomerFields(Protocol):
+    name: str
+    phone: str
+    social_link: str | None
+
+
+def _values(customer: CustomerFields) -> dict:
+    return {
+        "name": customer.name,
+        "name_folded": text.fold(customer.name),
+        "phone": customer.phone,
+        "phone_digits": text.phone_digits(customer.phone),
+        "social_link": customer.social_link,
+    }
+
+
+def _upsert_statement(db: AsyncSession, values: dict | list[dict]) -> Insert:
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(Customer).values(values)
+    return stmt.on_conflict_do_update(
+        index_elements=[Customer.phone],
+        set_={
+            "name": stmt.excluded.name,
+            "name_folded": stmt.excluded.name_folded,
+            "social_link": stmt.excluded.social_link,
+            "updated_at": func.now(),
+        },
+        # A returning customer with the same details must keep updated_at: it versions
+        # the customer and every one of their orders for conditional GETs.
+        where=or_(
+            Customer.name.is_distinct_from(stmt.excluded.name),
+            Customer.social_link.is_distinct_from(stmt.excluded.social_link),
+        ),
+    )
+
+
+async def upsert_customer(db: AsyncSession, customer: CustomerFields) -> Customer:
+    """Insert the customer or update the one with the same phone, in one statement.
+
+    Concurrent upserts of a new phone cannot race into a unique violation: the
+    loser of the insert takes the update branch instead.
+    """
+    stmt = _upsert_statement(db, _values(customer)).returning(Customer)
+    upserted = (await db.scalars(stmt, execution_options={"populate_existing": True})).one_or_none()
+    if upserted is not None:
+        return upserted
+    # Nothing changed, so the update branch was skipped and returned no row.
+    return (await db.scalars(select(Customer).where(Customer.phone == customer.phone))).one()
+
+
+async def upsert_customers(db: AsyncSession, customers: Iterable[CustomerFields]) -> dict[str, int]:
+    """Batch form of ``upsert_customer``; returns customer ids by phone.
+
+    The last entry wins for repeated phones, since one statement cannot update
+    the same row twice.
+    """
+    latest = {customer.phone: customer for customer in customers}
+    if not latest:
+        return {}
+    stmt = _upsert_statement(db, [_values(customer) for customer in latest.values()])
+    rows = await db.execute(stmt.returning(Customer.id, Customer.phone))
+    ids = {phone: customer_id for customer_id, phone in rows}
+    unchanged = latest.keys() - ids.keys()
+    if unchanged:
+        rows = await db.execute(select(Customer.id, Customer.phone).where(Customer.phone.in_(unchanged)))
+        ids.update({phone: customer_id for customer_id, phone in rows})
+    return ids
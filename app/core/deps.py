@@ -1,4 +1,4 @@
-from collections.abc import Callable
+from collections.abc import AsyncGenerator, Callable
 from typing import Generator
 
 from fastapi import Depends, HTTPException, status
@@ -6,12 +6,14 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.auth_cache import AuthenticatedUser, user_cache
 from app.core.config import get_settings
 from app.core.security import ALGORITHM
 from app.db.models.users import User, UserRole
-from app.db.session import get_db_session
+from app.db.session import get_async_db_session, get_db_session
 from app.schemas.auth import TokenPayload
 
 
@@ -22,10 +24,15 @@ def get_db() -> Generator[Session, None, None]:
     yield from get_db_session()
 
 
-def get_current_user(
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async for db in get_async_db_session():
+        yield db
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+    db: AsyncSession = Depends(get_async_db),
+) -> AuthenticatedUser:
     settings = get_settings()
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -38,20 +45,32 @@ def get_current_user(
     except (JWTError, ValidationError) as exc:  # pragma: no cover - simple re-raise
         raise credentials_exception from exc
 
-    user = db.execute(select(User).where(User.name == token_data.sub)).scalar_one_or_none()
-    if user is None:
+    cached = user_cache.get(token_data.sub)
+    if cached is not None:
+        return cached
+
+    row = (
+        await db.execute(
+            select(User.id, User.name, User.role, User.is_active).where(User.name == token_data.sub)
+        )
+    ).one_or_none()
+    if row is None:
         raise credentials_exception
+    user = AuthenticatedUser(*row)
+    user_cache.set(token_data.sub, user, settings.auth_cache_ttl_seconds)
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(
+    current_user: AuthenticatedUser = Depends(get_current_user),
+) -> AuthenticatedUser:
     if not current_user.is_active:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
     return current_user
 
 
-def require_roles(*roles: UserRole) -> Callable[..., User]:
-    def dependency(current_user: User = Depends(get_current_active_user)) -> User:
+def require_roles(*roles: UserRole) -> Callable[..., AuthenticatedUser]:
+    async def dependency(current_user: AuthenticatedUser = Depends(get_current_active_user)) -> AuthenticatedUser:
         if current_user.role not in roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient role")
         return current_user
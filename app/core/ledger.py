@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sqlalchemy import ColumnElement, case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.models.orders import Order, Payment, PaymentType
+
+# (deposit delta, paid delta) applied to an order per unit of payment amount.
+PAYMENT_EFFECTS = {
+    PaymentType.DEPOSIT: (1, 1),
+    PaymentType.REMAINING: (0, 1),
+    PaymentType.REFUND: (0, -1),
+}
+
+
+@dataclass(frozen=True)
+class LedgerMismatch:
+    order_id: int
+    total_amount: int
+    deposit_amount: int
+    paid_amount: int
+    remaining_amount: int
+    ledger_deposit: int
+    ledger_paid: int
+
+
+def _remaining(total_amount: ColumnElement[int], paid_amount: ColumnElement[int]) -> ColumnElement[int]:
+    return case((total_amount > paid_amount, total_amount - paid_amount), else_=0)
+
+
+async def apply_payment(db: AsyncSession, order_id: int, payment_type: PaymentType, amount: int) -> bool:
+    """Fold one payment into the order totals with a single atomic UPDATE.
+
+    The new values are computed from the row's current values inside the
+    statement, so concurrent payments on the same order serialize on the row
+    lock instead of overwriting each other. Returns False if the order does not exist.
+    """
+    deposit_sign, paid_sign = PAYMENT_EFFECTS[payment_type]
+    new_paid = Order.paid_amount + paid_sign * amount
+    result = await db.execute(
+        update(Order)
+        .where(Order.id == order_id)
+        .values(
+            deposit_amount=Order.deposit_amount + deposit_sign * amount,
+            paid_amount=new_paid,
+            remaining_amount=_remaining(Order.total_amount, new_paid),
+        )
+        .returning(Order.id)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+def find_ledger_mismatches(
+    db: Session, after_id: int = 0, batch_size: int = 10000
+) -> tuple[list[LedgerMismatch], int | None]:
+    """Compare stored totals with the payments ledger for one id-ordered batch of orders.
+
+    Amounts taken at order creation count as an opening deposit, so an order is
+    consistent when ``paid - ledger_paid == deposit - ledger_deposit >= 0`` and
+    ``remaining == max(total - paid, 0)``. Returns the mismatches and the id to
+    resume from, or None once every order has been checked.
+    """
+    batch = select(Order.id).where(Order.id > after_id).order_by(Order.id).limit(batch_size).subquery()
+    last_id = db.execute(select(func.max(batch.c.id))).scalar_one()
+    if last_id is None:
+        return [], None
+
+    ledger = (
+        select(
+            Payment.order_id,
+            func.sum(case((Payment.type == PaymentType.DEPOSIT, Payment.amount), else_=0)).label("deposit"),
+            func.sum(case((Payment.type == PaymentType.REFUND, -Payment.amount), else_=Payment.amount)).label("paid"),
+        )
+        .where(Payment.order_id > after_id, Payment.order_id <= last_id)
+        .group_by(Payment.order_id)
+        .subquery()
+    )
+    ledger_deposit = func.coalesce(ledger.c.deposit, 0)
+    ledger_paid = func.coalesce(ledger.c.paid, 0)
+    rows = db.execute(
+        select(
+            Order.id,
+            Order.total_amount,
+            Order.deposit_amount,
+            Order.paid_amount,
+            Order.remaining_amount,
+            ledger_deposit,
+            ledger_paid,
+        )
+        .outerjoin(ledger, ledger.c.order_id == Order.id)
+        .where(
+            Order.id > after_id,
+            Order.id <= last_id,
+            or_(
+                Order.paid_amount - ledger_paid != Order.deposit_amount - ledger_deposit,
+                Order.deposit_amount < ledger_deposit,
+                Order.remaining_amount != _remaining(Order.total_amount, Order.paid_amount),
+            ),
+        )
+        .order_by(Order.id)
+    ).all()
+    return [LedgerMismatch(*row) for row in rows], last_id
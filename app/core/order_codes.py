@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import os
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.models.orders import ORDER_CODE_BLOCK_SIZE, OrderCodeCounter, order_code_seq
+
+CODE_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+CODE_LENGTH = 7
+_HALF_BITS = 17
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ROUNDS = 4
+MAX_CODE_VALUE = 1 << (2 * _HALF_BITS)
+
+
+def _secret() -> bytes:
+    return get_settings().order_code_secret.encode()
+
+
+def _round(key: bytes, value: int, round_index: int) -> int:
+    digest = hmac.new(key, f"{round_index}:{value}".encode(), hashlib.sha256).digest()
+    return int.from_bytes(digest[:4], "big") & _HALF_MASK
+
+
+def encode_order_code(value: int, key: bytes | None = None) -> str:
+    """Map a counter value to a 7-character code through a keyed Feistel permutation.
+
+    The permutation is a bijection on 34-bit integers, so distinct counter values
+    always give distinct codes while consecutive values look unrelated.
+    """
+    if not 0 <= value < MAX_CODE_VALUE:
+        raise ValueError("Order code space exhausted")
+    key = key or _secret()
+    left, right = value >> _HALF_BITS, value & _HALF_MASK
+    for round_index in range(_ROUNDS):
+        left, right = right, left ^ _round(key, right, round_index)
+    permuted = (left << _HALF_BITS) | right
+    chars = []
+    for _ in range(CODE_LENGTH):
+        chars.append(CODE_ALPHABET[permuted & 31])
+        permuted >>= 5
+    return "".join(reversed(chars))
+
+
+def decode_order_code(code: str, key: bytes | None = None) -> int:
+    key = key or _secret()
+    permuted = 0
+    for char in code:
+        permuted = (permuted << 5) | CODE_ALPHABET.index(char)
+    left, right = permuted >> _HALF_BITS, permuted & _HALF_MASK
+    for round_index in reversed(range(_ROUNDS)):
+        left, right = right ^ _round(key, left, round_index), left
+    return (left << _HALF_BITS) | right
+
+
+async def _reserve_from_counter(db: AsyncSession, count: int) -> range:
+    # Runs inside the caller's transaction, so a rollback releases the values as well.
+    result = await db.execute(
+        update(OrderCodeCounter)
+        .where(OrderCodeCounter.id == 1)
+        .values(next_value=OrderCodeCounter.next_value + count)
+        .returning(OrderCodeCounter.next_value)
+    )
+    new_end = result.scalar_one_or_none()
+    if new_end is None:
+        new_end = 1 + count
+        await db.execute(insert(OrderCodeCounter).values(id=1, next_value=new_end))
+    return range(new_end - count, new_end)
+
+
+class OrderCodeAllocator:
+    """Hands out order codes from per-worker blocks reserved with one ``nextval`` each.
+
+    Sequence values are never reused, even when the reserving transaction rolls
+    back, so concurrent workers can never allocate the same code.
+    """
+
+    def __init__(self, block_size: int = ORDER_CODE_BLOCK_SIZE) -> None:
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._pid = os.getpid()
+        self._lock: asyncio.Lock | None = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Created on first use, inside the serving loop, rather than when the module is imported.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def allocate(self, db: AsyncSession, count: int = 1) -> list[str]:
+        if db.get_bind().dialect.name != "postgresql":
+            return [encode_order_code(value) for value in await _reserve_from_counter(db, count)]
+
+        values: list[int] = []
+        async with self._get_lock():
+            if self._pid != os.getpid():
+                # A forked worker must not hand out its parent's block.
+                self._next, self._end, self._pid = 0, 0, os.getpid()
+            while len(values) < count:
+                if self._next >= self._end:
+                    start = (await db.execute(select(order_code_seq.next_value()))).scalar_one()
+                    self._next, self._end = start, start + self.block_size
+                take = min(count - len(values), self._end - self._next)
+                values.extend(range(self._next, self._next + take))
+                self._next += take
+        return [encode_order_code(value) for value in values]
+
+
+order_code_allocator = OrderCodeAllocator()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import threading
+import time
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, Table, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql.util import find_tables
+
+from app.core.config import get_settings
+from app.schemas.common import CountMode
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+class CountCache:
+    """Bounded per-process cache of list totals keyed by the filtered statement.
+
+    Entries expire after a short TTL and are dropped as soon as a committed
+    session has written to any table the statement reads from.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._entries: dict[tuple, tuple[float, int, frozenset[str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> int | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, total, _ = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return total
+
+    def set(self, key: tuple, total: int, tables: frozenset[str], ttl_seconds: float) -> None:
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.maxsize:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + ttl_seconds, total, tables)
+
+    def invalidate(self, tables: set[str]) -> None:
+        with self._lock:
+            stale = [key for key, (_, _, entry_tables) in self._entries.items() if entry_tables & tables]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_tables(session: Session, flush_context: object) -> None:
+    written = session.info.setdefault("written_tables", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        written.add(instance.__table__.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tables(orm_execute_state: ORMExecuteState) -> None:
+    # INSERT/UPDATE/DELETE statements (upserts, bulk updates) bypass the flush.
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        written = orm_execute_state.session.info.setdefault("written_tables", set())
+        written.add(orm_execute_state.statement.table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_written_tables(session: Session) -> None:
+    written = session.info.pop("written_tables", None)
+    if written:
+        count_cache.invalidate(written)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_tables(session: Session) -> None:
+    session.info.pop("written_tables", None)
+
+
+async def _exact_count(db: AsyncSession, stmt: Select) -> int:
+    return (await db.execute(select(func.count()).select_from(stmt.order_by(None).subquery()))).scalar_one()
+
+
+async def _estimated_count(db: AsyncSession, stmt: Select) -> int | None:
+    dialect = db.get_bind().dialect
+    if dialect.name != "postgresql":
+        return None
+    compiled = stmt.order_by(None).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    connection = await db.connection()
+    plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_total(db: AsyncSession, stmt: Select, mode: CountMode) -> tuple[int, CountMode]:
+    """Count the rows matched by ``stmt`` and report which strategy produced the number.
+
+    ``estimated`` reads the planner's row estimate and falls back to an exact
+    count on databases without one; ``cached`` serves a recent exact count for
+    the same filters when available.
+    """
+    if mode is CountMode.ESTIMATED:
+        estimate = await _estimated_count(db, stmt)
+        if estimate is not None:
+            return estimate, CountMode.ESTIMATED
+    elif mode is CountMode.CACHED:
+        compiled = stmt.compile(dialect=db.get_bind().dialect)
+        key = (str(compiled), tuple(sorted((name, repr(value)) for name, value in compiled.params.items())))
+        cached = count_cache.get(key)
+        if cached is not None:
+            return cached, CountMode.CACHED
+        total = await _exact_count(db, stmt)
+        tables = frozenset(table.name for table in find_tables(stmt) if isinstance(table, Table))
+        count_cache.set(key, total, tables, get_settings().count_cache_ttl_seconds)
+        return total, CountMode.EXACT
+    return await _exact_count(db, stmt), CountMode.EXACT
+
+
+async def fetch_page_with_total(
+    db: AsyncSession, stmt: Select, count_stmt: Select, skip: int, limit: int
+) -> tuple[list, int]:
+    """Fetch one page of ORM rows together with the exact number of matches.
+
+    The total rides along as ``count(*) OVER ()``, so a page that has rows costs a
+    single query; only a page past the end needs ``count_stmt`` to learn the total.
+    """
+    rows = (await db.execute(stmt.add_columns(func.count().over()).offset(skip).limit(limit))).all()
+    if rows:
+        return [row[0] for row in rows], rows[0][1]
+    if skip == 0:
+        return [], 0
+    return [], await _exact_count(db, count_stmt)
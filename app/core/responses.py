@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from fastapi import status
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+class ModelResponse(Response):
+    """JSON response rendered straight from an already validated Pydantic model.
+
+    Returning a Response skips FastAPI's second validation against
+    ``response_model`` and the ``jsonable_encoder`` pass, and the model is
+    serialized by pydantic-core in one step. Keep ``response_model`` on the route
+    so the OpenAPI schema still describes the payload.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        model: BaseModel,
+        status_code: int = status.HTTP_200_OK,
+        headers: Mapping[str, str] | None = None,
+        exclude_unset: bool = False,
+    ) -> None:
+        body = model.__pydantic_serializer__.to_json(model, exclude_unset=exclude_unset)
+        super().__init__(content=body, status_code=status_code, headers=headers)
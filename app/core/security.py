@@ -1,6 +1,13 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from typing import Any, Dict, TypeVar
 
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 
@@ -8,17 +15,102 @@ from app.core.config import get_settings
 
 ALGORITHM = "HS256"
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_settings = get_settings()
+
+# Hashes made with a different cost are flagged by needs_update and rehashed on the next login.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=_settings.bcrypt_rounds)
+
+T = TypeVar("T")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """Runs bcrypt on a dedicated process pool so hashing never holds request threads.
+
+    At most ``max_pending`` operations may be queued or running at once; beyond
+    that, or when one takes longer than ``timeout_seconds``, the caller gets a 503
+    and can retry instead of piling more work onto a saturated pool.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout_seconds: float) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self._executor: ProcessPoolExecutor | None = None
+        self._pid = os.getpid()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # A forked worker must start its own pool rather than use its parent's. Its children
+                # are spawned, since forking a process that already runs threads can deadlock them.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        busy = HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise busy
+            self._pending += 1
+        try:
+            job = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is held until the worker is done with the job, not until the caller gives up
+        # on it: a timed-out bcrypt call keeps its worker busy all the same.
+        job.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), self.timeout_seconds)
+        except asyncio.TimeoutError as exc:
+            raise busy from exc
+
+    def _release(self, job: Future | None = None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """Return whether the password matches and, if the stored hash is outdated, its replacement."""
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=_settings.password_hash_workers,
+    max_pending=_settings.password_hash_max_pending,
+    timeout_seconds=_settings.password_hash_timeout_seconds,
+)
+
+
 def create_access_token(subject: str, role: str, expires_minutes: int | None = None) -> str:
     settings = get_settings()
     expire_delta = timedelta(minutes=expires_minutes or settings.jwt_expires_min)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import heapq
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.core.text import fold, trigrams
+
+# Scores below this are mostly shared filler grams ("bo", "hoa") rather than a real match.
+MIN_SCORE = 0.3
+
+
+@dataclass(frozen=True, slots=True)
+class ResolvedSku:
+    sku_id: int
+    score: float
+    matched: str
+    matched_field: str
+
+
+class SkuResolver:
+    """Trigram index over diacritic-folded SKU codes, names and aliases.
+
+    Built once per catalog version; a lookup only touches the posting lists of
+    the query's own trigrams and builds result objects for the winners alone.
+    """
+
+    def __init__(self, entries: Iterable[tuple[int, str, str]]) -> None:
+        self._sku_ids: list[int] = []
+        self._fields: list[str] = []
+        self._texts: list[str] = []
+        self._sizes: list[int] = []
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        for sku_id, field, text in entries:
+            folded = fold(text)
+            grams = trigrams(folded)
+            if not grams:
+                continue
+            entry_id = len(self._sku_ids)
+            self._sku_ids.append(sku_id)
+            self._fields.append(field)
+            self._texts.append(text)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(entry_id)
+
+    def resolve(self, query: str, limit: int = 10, allowed: set[int] | None = None) -> list[ResolvedSku]:
+        folded = fold(query)
+        query_grams = trigrams(folded)
+        if not query_grams:
+            return []
+        shared: Counter[int] = Counter()
+        for gram in query_grams:
+            shared.update(self._postings.get(gram, ()))
+
+        # Mostly "how much of this entry appears in the query": free-text orders carry
+        # quantities and filler words that should not drag a full alias match down.
+        sizes, sku_ids, query_size = self._sizes, self._sku_ids, len(query_grams)
+        scored = [
+            (-(2 * overlap / sizes[entry_id] + overlap / query_size) / 3, sku_ids[entry_id], entry_id)
+            for entry_id, overlap in shared.items()
+        ]
+        # Several entries can point at one SKU, so take a generous head before deduplicating
+        # and only fall back to a full sort when that head holds too few distinct SKUs.
+        head = heapq.nsmallest(limit * 8, scored)
+        matches = self._distinct(head, limit, allowed)
+        if len(matches) < limit and len(head) < len(scored):
+            matches = self._distinct(sorted(scored), limit, allowed)
+        return matches
+
+    def _distinct(
+        self, scored: list[tuple[float, int, int]], limit: int, allowed: set[int] | None
+    ) -> list[ResolvedSku]:
+        matches: list[ResolvedSku] = []
+        seen: set[int] = set()
+        for negative_score, sku_id, entry_id in scored:
+            if -negative_score < MIN_SCORE:
+                break
+            if sku_id in seen or (allowed is not None and sku_id not in allowed):
+                continue
+            seen.add(sku_id)
+            matches.append(
+                ResolvedSku(
+                    sku_id=sku_id,
+                    score=round(-negative_score, 4),
+                    matched=self._texts[entry_id],
+                    matched_field=self._fields[entry_id],
+                )
+            )
+            if len(matches) == limit:
+                break
+        return matches
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+_NON_DIGIT = re.compile(r"\D+")
+
+
+def fold(text: str) -> str:
+    """Lowercase, strip diacritics and punctuation: "Bó hồng Đỏ!" -> "bo hong do"."""
+    decomposed = unicodedata.normalize("NFD", text.lower().replace("đ", "d"))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", stripped).strip()
+
+
+def phone_digits(phone: str) -> str:
+    return _NON_DIGIT.sub("", phone)
+
+
+def canonical_phone(phone: str) -> str:
+    """Vietnamese numbers in national form, so "+84 912 345 678" and "0912345678" compare equal.
+
+    Other international numbers keep their leading +.
+    """
+    digits = phone_digits(phone)
+    if digits.startswith("84") and len(digits) == 11:
+        return "0" + digits[2:]
+    if phone.lstrip().startswith("+"):
+        return "+" + digits
+    return digits
+
+
+def trigrams(folded: str) -> set[str]:
+    # Each word is padded on its own, so word order does not matter and short words still produce grams.
+    grams: set[str] = set()
+    for word in folded.split():
+        padded = f" {word} "
+        grams.update(padded[index : index + 3] for index in range(len(padded) - 2))
+    return grams
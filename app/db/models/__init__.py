@@ -4,6 +4,7 @@ from app.db.models.orders import (
     AssignmentRole,
     AssignmentStatus,
     Order,
+    OrderCodeCounter,
     OrderItem,
     OrderSource,
     OrderStatus,
@@ -12,15 +13,17 @@ from app.db.models.orders import (
     PaymentType,
     ReceiveMethod,
 )
-from app.db.models.skus import Sku, SkuAlias, SkuBom
+from app.db.models.skus import CatalogVersion, Sku, SkuAlias, SkuBom, SkuBomClosure
 from app.db.models.users import User, UserRole
 
 __all__ = [
     "Assignment",
     "AssignmentRole",
     "AssignmentStatus",
+    "CatalogVersion",
     "Customer",
     "Order",
+    "OrderCodeCounter",
     "OrderItem",
     "OrderSource",
     "OrderStatus",
@@ -31,6 +34,7 @@ __all__ = [
     "Sku",
     "SkuAlias",
     "SkuBom",
+    "SkuBomClosure",
     "User",
     "UserRole",
 ]
@@ -1,29 +1,73 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from typing import TYPE_CHECKING
 
 import sqlalchemy as sa
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.engine.default import DefaultExecutionContext
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
+from app.core import text
 from app.db.base import Base
 
 if TYPE_CHECKING:  # pragma: no cover - circular import safety
     from app.db.models.orders import Order
 
 
+def _derived_from(source: str, normalize: Callable[[str], str]) -> Callable[[DefaultExecutionContext], str]:
+    # Fills the search columns for executemany-style Core inserts; multi-VALUES inserts must pass them explicitly.
+    def default(context: DefaultExecutionContext) -> str:
+        return normalize(context.get_current_parameters()[source])
+
+    return default
+
+
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        # Substring search over the folded name and the phone digits; prefix phone
+        # lookups use the plain B-tree on phone_digits instead.
+        sa.Index(
+            "ix_customers_name_folded_trgm",
+            "name_folded",
+            postgresql_using="gin",
+            postgresql_ops={"name_folded": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        sa.Index(
+            "ix_customers_phone_digits_trgm",
+            "phone_digits",
+            postgresql_using="gin",
+            postgresql_ops={"phone_digits": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
     name: Mapped[str] = mapped_column(sa.String(255), nullable=False)
     phone: Mapped[str] = mapped_column(sa.String(32), nullable=False, unique=True, index=True)
+    # Search forms of name and phone: diacritic-folded lowercase words, digits only.
+    name_folded: Mapped[str] = mapped_column(
+        sa.String(255), nullable=False, default=_derived_from("name", text.fold), server_default=""
+    )
+    phone_digits: Mapped[str] = mapped_column(
+        sa.String(32), nullable=False, default=_derived_from("phone", text.phone_digits), server_default="", index=True
+    )
     social_link: Mapped[str | None] = mapped_column(sa.Text, nullable=True)
     notes: Mapped[str | None] = mapped_column(sa.Text, nullable=True)
     created_at: Mapped[sa.DateTime] = mapped_column(
-        sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
+        sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now(), index=True
     )
     updated_at: Mapped[sa.DateTime] = mapped_column(
         sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now(), onupdate=sa.func.now()
     )
 
     orders: Mapped[list["Order"]] = relationship("Order", back_populates="customer")
+
+    @validates("name")
+    def _fold_name(self, key: str, value: str) -> str:
+        self.name_folded = text.fold(value)
+        return value
+
+    @validates("phone")
+    def _normalize_phone(self, key: str, value: str) -> str:
+        self.phone_digits = text.phone_digits(value)
+        return value
@@ -62,15 +62,36 @@ class AssignmentRole(str, enum.Enum):
     FLORIST = UserRole.FLORIST.value
 
 
+ORDER_CODE_BLOCK_SIZE = 100
+
+# Each nextval() reserves a block of ORDER_CODE_BLOCK_SIZE code values for one worker.
+order_code_seq = sa.Sequence("order_code_seq", start=1, increment=ORDER_CODE_BLOCK_SIZE, metadata=Base.metadata)
+
+# Orders still to be prepared or delivered; the partial receive_at index only covers these.
+OPEN_ORDER_CONDITION = sa.text("status NOT IN ('COMPLETED', 'CANCELLED')")
+
+
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        sa.Index("ix_orders_created_at_id", "created_at", "id"),
+        sa.Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        sa.Index(
+            "ix_orders_open_receive_at",
+            "receive_at",
+            postgresql_where=OPEN_ORDER_CONDITION,
+            sqlite_where=OPEN_ORDER_CONDITION,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
     code: Mapped[str] = mapped_column(sa.String(32), nullable=False, unique=True, index=True)
-    customer_id: Mapped[int] = mapped_column(sa.ForeignKey("customers.id", ondelete="RESTRICT"), nullable=False)
+    customer_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("customers.id", ondelete="RESTRICT"), nullable=False, index=True
+    )
     receiver_name: Mapped[str] = mapped_column(sa.String(255), nullable=False)
     receiver_phone: Mapped[str | None] = mapped_column(sa.String(32), nullable=True)
-    receive_at: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True), nullable=True)
+    receive_at: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True), nullable=True, index=True)
     receive_method: Mapped[ReceiveMethod | None] = mapped_column(
         sa.Enum(ReceiveMethod, name="receivemethod", create_type=False), nullable=True
     )
@@ -85,6 +106,7 @@ class Order(Base):
     total_amount: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0, server_default="0")
     deposit_amount: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0, server_default="0")
     remaining_amount: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0, server_default="0")
+    paid_amount: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0, server_default="0")
     created_by: Mapped[int | None] = mapped_column(sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()
@@ -94,7 +116,7 @@ class Order(Base):
     )
 
     customer: Mapped["Customer"] = relationship("Customer", back_populates="orders")
-    creator: Mapped["User" | None] = relationship("User")
+    creator: Mapped["User | None"] = relationship("User")
     items: Mapped[list["OrderItem"]] = relationship(
         "OrderItem", back_populates="order", cascade="all, delete-orphan"
     )
@@ -110,8 +132,10 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
-    order_id: Mapped[int] = mapped_column(sa.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
-    sku_id: Mapped[int] = mapped_column(sa.ForeignKey("skus.id", ondelete="RESTRICT"), nullable=False)
+    order_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    sku_id: Mapped[int] = mapped_column(sa.ForeignKey("skus.id", ondelete="RESTRICT"), nullable=False, index=True)
     sku_name_snapshot: Mapped[str] = mapped_column(sa.String(255), nullable=False)
     qty: Mapped[Decimal] = mapped_column(sa.Numeric(12, 3), nullable=False)
     unit_price: Mapped[int] = mapped_column(sa.BigInteger, nullable=False)
@@ -128,7 +152,9 @@ class Payment(Base):
     __tablename__ = "payments"
 
     id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
-    order_id: Mapped[int] = mapped_column(sa.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    order_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     type: Mapped[PaymentType] = mapped_column(
         sa.Enum(PaymentType, name="paymenttype", create_type=False), nullable=False
     )
@@ -140,15 +166,19 @@ class Payment(Base):
     recorded_by: Mapped[int | None] = mapped_column(sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
 
     order: Mapped[Order] = relationship("Order", back_populates="payments")
-    recorder: Mapped["User" | None] = relationship("User")
+    recorder: Mapped["User | None"] = relationship("User")
 
 
 class Assignment(Base):
     __tablename__ = "assignments"
 
     id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
-    order_id: Mapped[int] = mapped_column(sa.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
-    assignee_id: Mapped[int] = mapped_column(sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    order_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    assignee_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     role: Mapped[AssignmentRole] = mapped_column(
         sa.Enum(AssignmentRole, name="assignmentrole", create_type=False), nullable=False
     )
@@ -164,3 +194,12 @@ class Assignment(Base):
 
     order: Mapped[Order] = relationship("Order", back_populates="assignments")
     assignee: Mapped["User"] = relationship("User")
+
+
+class OrderCodeCounter(Base):
+    """Order code counter for databases without sequences (SQLite in development and tests)."""
+
+    __tablename__ = "order_code_counter"
+
+    id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
+    next_value: Mapped[int] = mapped_column(sa.BigInteger, nullable=False)
@@ -47,7 +47,7 @@ class SkuAlias(Base):
     __tablename__ = "sku_aliases"
 
     id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
-    sku_id: Mapped[int] = mapped_column(sa.ForeignKey("skus.id", ondelete="CASCADE"), nullable=False)
+    sku_id: Mapped[int] = mapped_column(sa.ForeignKey("skus.id", ondelete="CASCADE"), nullable=False, index=True)
     alias: Mapped[str] = mapped_column(sa.String(255), nullable=False, index=True)
 
     sku: Mapped[Sku] = relationship("Sku", back_populates="aliases")
@@ -57,10 +57,43 @@ class SkuBom(Base):
     __tablename__ = "sku_bom"
 
     id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
-    parent_sku_id: Mapped[int] = mapped_column(sa.ForeignKey("skus.id", ondelete="CASCADE"), nullable=False)
-    component_sku_id: Mapped[int] = mapped_column(sa.ForeignKey("skus.id", ondelete="RESTRICT"), nullable=False)
+    parent_sku_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("skus.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    component_sku_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("skus.id", ondelete="RESTRICT"), nullable=False, index=True
+    )
     qty: Mapped[Decimal] = mapped_column(sa.Numeric(12, 3), nullable=False)
     uom: Mapped[str | None] = mapped_column(sa.String(64), nullable=True)
 
     parent: Mapped[Sku] = relationship("Sku", foreign_keys=[parent_sku_id], back_populates="bom_components")
     component: Mapped[Sku] = relationship("Sku", foreign_keys=[component_sku_id], back_populates="bom_usages")
+
+
+class SkuBomClosure(Base):
+    """Every (ancestor, descendant) pair reachable through sku_bom, with the effective
+    quantity of the descendant per unit of the ancestor summed over all paths.
+
+    Maintained incrementally by app.core.bom whenever SkuBom rows are flushed.
+    """
+
+    __tablename__ = "sku_bom_closure"
+
+    ancestor_sku_id: Mapped[int] = mapped_column(sa.ForeignKey("skus.id", ondelete="CASCADE"), primary_key=True)
+    descendant_sku_id: Mapped[int] = mapped_column(
+        sa.ForeignKey("skus.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    qty: Mapped[Decimal] = mapped_column(sa.Numeric(18, 6), nullable=False)
+    is_leaf: Mapped[bool] = mapped_column(sa.Boolean, nullable=False)
+
+
+class CatalogVersion(Base):
+    """Single-row counter bumped in the same transaction as every catalog write.
+
+    Workers compare it with the version of their cached catalog to detect staleness.
+    """
+
+    __tablename__ = "catalog_version"
+
+    id: Mapped[int] = mapped_column(sa.Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(sa.BigInteger, nullable=False)
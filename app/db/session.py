@@ -1,11 +1,16 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.core.config import get_database_url
+from app.core.config import get_async_database_url, get_database_url
 
+# The sync engine stays for scripts, Alembic and the streaming export endpoints.
 engine = create_engine(get_database_url(), pool_pre_ping=True)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
 
+async_engine = create_async_engine(get_async_database_url(), pool_pre_ping=True)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 
 def get_db_session():
     db = SessionLocal()
@@ -13,3 +18,8 @@ def get_db_session():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db_session():
+    async with AsyncSessionLocal() as db:
+        yield db
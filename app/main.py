@@ -1,9 +1,13 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import get_settings
+from app.core.security import password_hasher
 from app.routers import auth, health
-from app.routers import customers, orders, skus
+from app.routers import customers, export, orders, skus
 
 TAGS_METADATA = [
     {
@@ -26,11 +30,22 @@ TAGS_METADATA = [
         "name": "orders",
         "description": "Order lifecycle management endpoints.",
     },
+    {
+        "name": "export",
+        "description": "Streaming CSV/NDJSON exports for reconciliation and reporting.",
+    },
 ]
 
 settings = get_settings()
 
-app = FastAPI(title="Florist CRM API", openapi_tags=TAGS_METADATA)
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    password_hasher.shutdown()
+
+
+app = FastAPI(title="Florist CRM API", openapi_tags=TAGS_METADATA, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -45,3 +60,4 @@ app.include_router(auth.router)
 app.include_router(customers.router)
 app.include_router(skus.router)
 app.include_router(orders.router)
+app.include_router(export.router)
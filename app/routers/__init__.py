@@ -1,3 +1,3 @@
-from app.routers import auth, customers, health, orders, skus
+from app.routers import auth, customers, export, health, orders, skus
 
-__all__ = ["auth", "customers", "health", "orders", "skus"]
+__all__ = ["auth", "customers", "export", "health", "orders", "skus"]
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core import deps, security
+from app.core.auth_cache import AuthenticatedUser
 from app.db.models.users import User
 from app.schemas.auth import Token
 from app.schemas.users import UserRead
@@ -12,18 +14,30 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=Token, summary="Authenticate user")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
 ) -> Token:
-    user = db.execute(select(User).where(User.name == form_data.username)).scalar_one_or_none()
-    if user is None or not security.verify_password(form_data.password, user.hashed_password):
+    user = (await db.execute(select(User).where(User.name == form_data.username))).scalar_one_or_none()
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect username or password")
+    valid, new_hash = await security.password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect username or password")
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await db.commit()
 
     token = security.create_access_token(subject=user.name, role=user.role.value)
     return Token(access_token=token, role=user.role)
 
 
 @router.get("/me", response_model=UserRead, summary="Get current user")
-def read_me(current_user: User = Depends(deps.get_current_active_user)) -> User:
-    return current_user
+def read_me(
+    current_user: AuthenticatedUser = Depends(deps.get_current_active_user),
+    db: Session = Depends(deps.get_db),
+) -> User:
+    user = db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
@@ -1,72 +1,100 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, or_, select
-from sqlalchemy.orm import Session
+import re
 
-from app.core import deps
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response
+from sqlalchemy import ColumnElement, and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import customer_upsert, deps, text
+from app.core.conditional import ResourceVersion
+from app.core.pagination import count_total, fetch_page_with_total
+from app.core.responses import ModelResponse
 from app.db.models.customers import Customer
+from app.schemas.common import CountMode
 from app.schemas.customers import CustomerList, CustomerRead, CustomerUpsert
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 
 
+PHONE_QUERY = re.compile(r"^\+?[\d\s.()-]+$")
+
+
+def customer_phone_condition(phone: str) -> ColumnElement[bool]:
+    """Match customers by phone on the digits-only search column.
+
+    A leading 0 or + means the start of a number was typed, which becomes a range
+    over the phone_digits B-tree; anything else is a substring match, served by the
+    trigram index on PostgreSQL.
+    """
+    digits = text.phone_digits(phone)
+    if not digits:
+        return Customer.phone_digits.contains(phone.strip(), autoescape=True)
+    if phone.lstrip().startswith(("0", "+")):
+        upper = digits[:-1] + chr(ord(digits[-1]) + 1)
+        return and_(Customer.phone_digits >= digits, Customer.phone_digits < upper)
+    return Customer.phone_digits.contains(digits, autoescape=True)
+
+
+def customer_search_condition(q: str) -> ColumnElement[bool]:
+    name_condition = Customer.name_folded.contains(text.fold(q), autoescape=True)
+    if PHONE_QUERY.match(q.strip()):
+        # Names can hold digits too ("Shop 24"); each side of the OR keeps its own index.
+        return or_(name_condition, customer_phone_condition(q))
+    return name_condition
+
+
 @router.post("/upsert_by_phone", response_model=CustomerRead, summary="Upsert customer by phone")
-def upsert_customer(
+async def upsert_customer(
     payload: CustomerUpsert,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     _: object = Depends(deps.get_current_active_user),
 ) -> Customer:
-    existing = db.execute(select(Customer).where(Customer.phone == payload.phone)).scalar_one_or_none()
-    if existing is None:
-        customer = Customer(
-            name=payload.name,
-            phone=payload.phone,
-            social_link=payload.social_link,
-        )
-        db.add(customer)
-        db.flush()
-    else:
-        existing.name = payload.name
-        existing.social_link = payload.social_link
-        customer = existing
-    db.commit()
-    db.refresh(customer)
+    customer = await customer_upsert.upsert_customer(db, payload)
+    await db.commit()
     return customer
 
 
 @router.get("", response_model=CustomerList, summary="List customers with search")
-def list_customers(
-    q: str | None = Query(default=None, description="Search by name or phone"),
+async def list_customers(
+    q: str | None = Query(default=None, description="Search by name or phone; a leading 0 or + matches phones by prefix"),
+    count_mode: CountMode = Query(default=CountMode.EXACT, alias="count", description="How total is computed"),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=50, ge=1, le=100),
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     _: object = Depends(deps.get_current_active_user),
 ) -> CustomerList:
     query = select(Customer).order_by(Customer.created_at.desc())
-    count_query = select(func.count()).select_from(Customer)
+    count_query = select(Customer.id)
 
     if q:
-        pattern = f"%{q.lower()}%"
-        condition = or_(
-            func.lower(Customer.name).like(pattern),
-            func.lower(Customer.phone).like(pattern),
-        )
+        condition = customer_search_condition(q)
         query = query.where(condition)
         count_query = count_query.where(condition)
 
-    total = db.execute(count_query).scalar_one()
-    customers = db.execute(query.offset(skip).limit(limit)).scalars().all()
-    return CustomerList(total=total, skip=skip, limit=limit, items=customers)
+    # A search pays for its filter once by counting in the page query; the unfiltered
+    # list is better served by an index-ordered page plus a count over the narrowest index.
+    if q and count_mode is CountMode.EXACT:
+        customers, total = await fetch_page_with_total(db, query, count_query, skip, limit)
+        total_mode = CountMode.EXACT
+    else:
+        total, total_mode = await count_total(db, count_query, count_mode)
+        customers = (await db.scalars(query.offset(skip).limit(limit))).all()
+    return CustomerList(total=total, total_mode=total_mode, skip=skip, limit=limit, items=customers)
 
 
 @router.get("/{customer_id}", response_model=CustomerRead, summary="Get customer by id")
-def get_customer(
+async def get_customer(
     customer_id: int,
-    db: Session = Depends(deps.get_db),
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
     _: object = Depends(deps.get_current_active_user),
-) -> Customer:
-    customer = db.get(Customer, customer_id)
+) -> Response:
+    customer = await db.get(Customer, customer_id)
     if customer is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
-    return customer
+    version = ResourceVersion("customer", customer.id, customer.updated_at, last_modified=customer.updated_at)
+    if version.matches(request):
+        return version.not_modified()
+    return ModelResponse(CustomerRead.model_validate(customer), headers=version.headers)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import csv
+import enum
+import io
+import json
+from collections.abc import Iterator
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.core import deps
+from app.db.models.customers import Customer
+from app.db.models.orders import Order, OrderStatus, Payment, PaymentMethod, PaymentType
+from app.db.models.users import UserRole
+from app.routers.customers import customer_search_condition
+from app.routers.orders import apply_order_filters
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+EXPORT_CHUNK_ROWS = 1000
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+MEDIA_TYPES = {ExportFormat.CSV: "text/csv", ExportFormat.NDJSON: "application/x-ndjson"}
+
+
+def _plain(value: object) -> object:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _stream_rows(db: Session, query: Select, export_format: ExportFormat) -> Iterator[str]:
+    # Dependencies with yield have already exited once the body streams, so the
+    # generator owns the session from here on and closes it when done.
+    try:
+        result = db.execute(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == ExportFormat.CSV:
+            writer.writerow(columns)
+        for chunk in result.partitions():
+            for row in chunk:
+                values = [_plain(value) for value in row]
+                if export_format == ExportFormat.CSV:
+                    writer.writerow(["" if value is None else value for value in values])
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False, default=str))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+def _export_response(db: Session, query: Select, export_format: ExportFormat, name: str) -> StreamingResponse:
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_format.value}"
+    return StreamingResponse(
+        _stream_rows(db, query, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/orders", summary="Export orders")
+def export_orders(
+    status_filter: OrderStatus | None = Query(default=None, alias="status"),
+    date_from: datetime | None = Query(default=None),
+    date_to: datetime | None = Query(default=None),
+    phone: str | None = Query(default=None, description="Customer phone contains"),
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias="format"),
+    db: Session = Depends(deps.get_db),
+    _: object = Depends(deps.require_roles(UserRole.BOSS, UserRole.ADMIN)),
+) -> StreamingResponse:
+    query = select(
+        Order.id,
+        Order.code,
+        Order.status,
+        Order.source,
+        Order.customer_id,
+        Customer.name.label("customer_name"),
+        Customer.phone.label("customer_phone"),
+        Order.receiver_name,
+        Order.receiver_phone,
+        Order.receive_method,
+        Order.receive_at,
+        Order.address,
+        Order.total_amount,
+        Order.deposit_amount,
+        Order.paid_amount,
+        Order.remaining_amount,
+        Order.created_at,
+    ).join(Order.customer)
+    query = apply_order_filters(query, status_filter, date_from, date_to, phone, join_customer=False)
+    return _export_response(db, query.order_by(Order.id), export_format, "orders")
+
+
+@router.get("/customers", summary="Export customers")
+def export_customers(
+    q: str | None = Query(default=None, description="Search by name or phone"),
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias="format"),
+    db: Session = Depends(deps.get_db),
+    _: object = Depends(deps.require_roles(UserRole.BOSS, UserRole.ADMIN)),
+) -> StreamingResponse:
+    query = select(
+        Customer.id,
+        Customer.name,
+        Customer.phone,
+        Customer.social_link,
+        Customer.notes,
+        Customer.created_at,
+        Customer.updated_at,
+    )
+    if q:
+        query = query.where(customer_search_condition(q))
+    return _export_response(db, query.order_by(Customer.id), export_format, "customers")
+
+
+@router.get("/payments", summary="Export payments")
+def export_payments(
+    payment_type: PaymentType | None = Query(default=None, alias="type"),
+    method: PaymentMethod | None = Query(default=None),
+    date_from: datetime | None = Query(default=None, description="Paid at or after"),
+    date_to: datetime | None = Query(default=None, description="Paid at or before"),
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias="format"),
+    db: Session = Depends(deps.get_db),
+    _: object = Depends(deps.require_roles(UserRole.BOSS, UserRole.ADMIN)),
+) -> StreamingResponse:
+    query = select(
+        Payment.id,
+        Payment.order_id,
+        Order.code.label("order_code"),
+        Payment.type,
+        Payment.method,
+        Payment.amount,
+        Payment.paid_at,
+        Payment.recorded_by,
+    ).join(Payment.order)
+    if payment_type is not None:
+        query = query.where(Payment.type == payment_type)
+    if method is not None:
+        query = query.where(Payment.method == method)
+    if date_from is not None:
+        query = query.where(Payment.paid_at >= date_from)
+    if date_to is not None:
+        query = query.where(Payment.paid_at <= date_to)
+    return _export_response(db, query.order_by(Payment.id), export_format, "payments")
@@ -1,16 +1,50 @@
 from __future__ import annotations
 
-from datetime import datetime
+from collections.abc import AsyncIterator, Iterable
+import csv
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal, ROUND_HALF_UP
-import secrets
-
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session, selectinload
+import json
+import math
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response
+from pydantic import ValidationError
+from sqlalchemy import (
+    ColumnElement,
+    FromClause,
+    Integer,
+    Numeric,
+    Select,
+    and_,
+    cast,
+    column,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    true,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.types import TypeEngine
 
 from app.core import deps
+from app.core.auth_cache import AuthenticatedUser
+from app.core.catalog import Catalog, catalog_cache
+from app.core.conditional import ResourceVersion
+from app.core.customer_upsert import upsert_customer, upsert_customers
+from app.core.ledger import apply_payment
+from app.core.order_codes import order_code_allocator
+from app.core.pagination import count_total, decode_cursor, encode_cursor
+from app.core.responses import ModelResponse
 from app.db.models.customers import Customer
 from app.db.models.orders import (
+    OPEN_ORDER_CONDITION,
     Assignment,
     AssignmentRole,
     AssignmentStatus,
@@ -19,18 +53,29 @@ from app.db.models.orders import (
     OrderSource,
     OrderStatus,
     Payment,
-    PaymentType,
+    ReceiveMethod,
 )
-from app.db.models.skus import Sku, SkuBom
+from app.db.models.skus import Sku
 from app.db.models.users import User, UserRole
+from app.routers.customers import customer_phone_condition
+from app.schemas.common import CountMode
 from app.schemas.orders import (
     AssignmentCreate,
     AssignmentRead,
-    CustomerInput,
+    BulkImportMode,
+    ComponentDemand,
+    ComponentDemandReport,
+    OrderBulkResult,
+    OrderBulkRowResult,
     OrderCreate,
     OrderList,
     OrderRead,
+    OrderSchedule,
+    OrderScheduleBucket,
     OrderStatusUpdate,
+    OrderSummary,
+    OrderSummaryList,
+    OrderView,
     PaymentCreate,
     PaymentRead,
 )
@@ -45,148 +90,280 @@ ALLOWED_TRANSITIONS = {
     OrderStatus.READY: {OrderStatus.COMPLETED},
 }
 
-
-def _generate_order_code(db: Session) -> str:
-    for _ in range(10):
-        candidate = secrets.token_hex(3).upper()
-        exists = db.execute(select(Order.id).where(Order.code == candidate)).scalar_one_or_none()
-        if exists is None:
-            return candidate
-    raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to generate order code")
-
-
-def _upsert_customer(db: Session, data: CustomerInput) -> Customer:
-    customer = db.execute(select(Customer).where(Customer.phone == data.phone)).scalar_one_or_none()
-    if customer is None:
-        customer = Customer(name=data.name, phone=data.phone, social_link=data.social_link)
-        db.add(customer)
-        db.flush()
-    else:
-        customer.name = data.name
-        customer.social_link = data.social_link
-    return customer
+BULK_MAX_ROWS = 5000
+BULK_BATCH_SIZE = 500
+# Generous for BULK_MAX_ROWS orders with a few items each; bodies are refused before they are parsed.
+BULK_MAX_BYTES = 16 * 1024 * 1024
+
+
+async def _load_order(db: AsyncSession, order_id: int) -> Order | None:
+    return (
+        await db.execute(
+            select(Order)
+            .options(
+                selectinload(Order.customer),
+                selectinload(Order.items),
+                selectinload(Order.payments),
+                selectinload(Order.assignments),
+            )
+            .where(Order.id == order_id)
+            .execution_options(populate_existing=True)
+        )
+    ).scalar_one_or_none()
 
 
-def _snapshot_bom(db: Session, sku_id: int) -> list[dict]:
-    rows = db.execute(select(SkuBom).options(selectinload(SkuBom.component)).where(SkuBom.parent_sku_id == sku_id)).scalars()
-    snapshot: list[dict] = []
-    for row in rows:
-        snapshot.append(
+def _price_items(payload: OrderCreate, catalog: Catalog) -> tuple[list[dict], int]:
+    total_amount = 0
+    item_rows: list[dict] = []
+    for item in payload.items or []:
+        sku = catalog.skus.get(item.sku_id)
+        if sku is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"SKU {item.sku_id} not found")
+        if not sku.is_template:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order items must reference template SKUs")
+
+        line_total_decimal = (item.qty * Decimal(item.unit_price)).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+        line_total = int(line_total_decimal)
+        item_rows.append(
             {
-                "component_sku_id": row.component_sku_id,
-                "component_code": row.component.code,
-                "component_name": row.component.name,
-                "qty": str(row.qty),
-                "uom": row.uom,
+                "sku_id": item.sku_id,
+                "sku_name_snapshot": sku.name,
+                "qty": item.qty,
+                "unit_price": item.unit_price,
+                "line_total": line_total,
+                "notes": item.notes,
+                "options_json": item.options or {},
+                "bom_snapshot": catalog.bom_snapshot(sku.id),
             }
         )
-    return snapshot
+        total_amount += line_total
 
+    if payload.items and total_amount <= 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order total must be positive when items are provided")
 
-def _recalculate_financials(order: Order) -> None:
-    deposit_paid = 0
-    total_paid = 0
-    for payment in order.payments:
-        if payment.type == PaymentType.DEPOSIT:
-            deposit_paid += payment.amount
-            total_paid += payment.amount
-        elif payment.type == PaymentType.REMAINING:
-            total_paid += payment.amount
-        elif payment.type == PaymentType.REFUND:
-            total_paid -= payment.amount
-    order.deposit_amount = deposit_paid
-    order.remaining_amount = max(order.total_amount - total_paid, 0)
+    if payload.deposit_amount and payload.deposit_amount > total_amount:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Deposit cannot exceed total amount")
+    return item_rows, total_amount
+
+
+def _order_values(payload: OrderCreate, code: str, customer_id: int, created_by: int, total_amount: int) -> dict:
+    deposit_amount = payload.deposit_amount if payload.items else 0
+    values = {
+        "code": code,
+        "customer_id": customer_id,
+        "receiver_name": payload.receiver.name,
+        "receiver_phone": payload.receiver.phone,
+        "status": OrderStatus.NEW if payload.items else OrderStatus.CONFIRMING,
+        "source": payload.source,
+        "card_message": payload.card_message,
+        "total_amount": total_amount,
+        "deposit_amount": deposit_amount,
+        "remaining_amount": max(total_amount - deposit_amount, 0),
+        "paid_amount": deposit_amount,
+        "created_by": created_by,
+        "receive_method": None,
+        "receive_at": None,
+        "address": None,
+    }
+    if payload.delivery:
+        values["receive_method"] = payload.delivery.method
+        values["receive_at"] = payload.delivery.receive_at_iso
+        values["address"] = payload.delivery.address
+    return values
 
 
 @router.post("", response_model=OrderRead, summary="Create order")
-def create_order(
+async def create_order(
     payload: OrderCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.require_roles(UserRole.SALE, UserRole.BOSS, UserRole.ADMIN, UserRole.FLORIST)),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: AuthenticatedUser = Depends(deps.require_roles(UserRole.SALE, UserRole.BOSS, UserRole.ADMIN, UserRole.FLORIST)),
 ) -> Order:
-    customer = _upsert_customer(db, payload.customer)
-    order_code = _generate_order_code(db)
-    status_value = OrderStatus.NEW if payload.items else OrderStatus.CONFIRMING
-
-    order = Order(
-        code=order_code,
-        customer_id=customer.id,
-        receiver_name=payload.receiver.name,
-        receiver_phone=payload.receiver.phone,
-        status=status_value,
-        source=payload.source,
-        created_by=current_user.id,
-    )
-
-    if payload.delivery:
-        order.receive_method = payload.delivery.method
-        order.receive_at = payload.delivery.receive_at_iso
-        order.address = payload.delivery.address
-    order.card_message = payload.card_message
+    item_rows, total_amount = _price_items(payload, await catalog_cache.get(db))
 
+    customer = await upsert_customer(db, payload.customer)
+    code = (await order_code_allocator.allocate(db))[0]
+    order = Order(**_order_values(payload, code, customer.id, current_user.id, total_amount))
     db.add(order)
-    db.flush()
-
-    total_amount = 0
-    if payload.items:
-        for item in payload.items:
-            sku = db.get(Sku, item.sku_id)
-            if sku is None:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"SKU {item.sku_id} not found")
-            if not sku.is_template:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order items must reference template SKUs")
-
-            line_total_decimal = (item.qty * Decimal(item.unit_price)).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
-            line_total = int(line_total_decimal)
-            order_item = OrderItem(
-                order_id=order.id,
-                sku_id=item.sku_id,
-                sku_name_snapshot=sku.name,
-                qty=item.qty,
-                unit_price=item.unit_price,
-                line_total=line_total,
-                notes=item.notes,
-                options_json=item.options or {},
-                bom_snapshot=_snapshot_bom(db, sku.id),
+    await db.flush()
+
+    if item_rows:
+        await db.execute(insert(OrderItem), [{**row, "order_id": order.id} for row in item_rows])
+    await db.commit()
+    return await _load_order(db, order.id)
+
+
+def _bulk_too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+
+
+async def _iter_body(request: Request) -> AsyncIterator[bytes]:
+    # Content-Length is checked up front; chunked bodies are cut off once they pass the cap.
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > BULK_MAX_BYTES:
+            raise _bulk_too_large(f"Request body exceeds {BULK_MAX_BYTES} bytes")
+        yield chunk
+
+
+async def _iter_body_lines(request: Request) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in _iter_body(request):
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+def _csv_to_payloads(lines: Iterable[str]) -> list[dict]:
+    grouped: dict[str, dict] = {}
+    for index, row in enumerate(csv.DictReader(lines)):
+        values = {key.strip(): (value or "").strip() or None for key, value in row.items() if key}
+        ref = values.get("ref") or f"#{index}"
+        payload = grouped.get(ref)
+        if payload is None:
+            if len(grouped) == BULK_MAX_ROWS:
+                # Stop at the first order past the limit instead of parsing the rest of the file.
+                raise _bulk_too_large(f"At most {BULK_MAX_ROWS} orders per request")
+            payload = {
+                "source": values.get("source"),
+                "customer": {
+                    "name": values.get("customer_name"),
+                    "phone": values.get("customer_phone"),
+                    "social_link": values.get("customer_social_link"),
+                },
+                "receiver": {"name": values.get("receiver_name"), "phone": values.get("receiver_phone")},
+                "card_message": values.get("card_message"),
+                "deposit_amount": values.get("deposit_amount") or 0,
+            }
+            if values.get("delivery_method"):
+                payload["delivery"] = {
+                    "method": values.get("delivery_method"),
+                    "receive_at_iso": values.get("receive_at"),
+                    "address": values.get("address"),
+                }
+            grouped[ref] = payload
+        if values.get("sku_id"):
+            payload.setdefault("items", []).append(
+                {
+                    "sku_id": values.get("sku_id"),
+                    "qty": values.get("qty"),
+                    "unit_price": values.get("unit_price"),
+                    "notes": values.get("notes"),
+                }
+            )
+    return list(grouped.values())
+
+
+async def _read_bulk_payloads(request: Request) -> list[object]:
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        if not content_length.isdigit():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Content-Length")
+        if int(content_length) > BULK_MAX_BYTES:
+            raise _bulk_too_large(f"Request body exceeds {BULK_MAX_BYTES} bytes")
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "application/json":
+        try:
+            payloads = json.loads(b"".join([chunk async for chunk in _iter_body(request)]))
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body") from exc
+        if not isinstance(payloads, list):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array of orders")
+    elif content_type in ("application/x-ndjson", "application/jsonl"):
+        payloads = []
+        async for line in _iter_body_lines(request):
+            if not line.strip():
+                continue
+            try:
+                payloads.append(json.loads(line))
+            except ValueError:
+                payloads.append(ValueError("Invalid JSON line"))
+            if len(payloads) > BULK_MAX_ROWS:
+                break
+    elif content_type == "text/csv":
+        payloads = _csv_to_payloads([line async for line in _iter_body_lines(request)])
+    else:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported content type")
+
+    if len(payloads) > BULK_MAX_ROWS:
+        raise _bulk_too_large(f"At most {BULK_MAX_ROWS} orders per request")
+    return payloads
+
+
+@router.post("/bulk", response_model=OrderBulkResult, summary="Bulk import orders")
+async def bulk_create_orders(
+    mode: BulkImportMode = Query(default=BulkImportMode.ATOMIC),
+    raw_payloads: list[object] = Depends(_read_bulk_payloads),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: AuthenticatedUser = Depends(deps.require_roles(UserRole.SALE, UserRole.BOSS, UserRole.ADMIN)),
+) -> OrderBulkResult:
+    results = [OrderBulkRowResult(index=index, ok=False) for index in range(len(raw_payloads))]
+
+    payloads: dict[int, OrderCreate] = {}
+    for index, raw in enumerate(raw_payloads):
+        if isinstance(raw, Exception):
+            results[index].errors.append(str(raw))
+            continue
+        try:
+            payloads[index] = OrderCreate.model_validate(raw)
+        except ValidationError as exc:
+            results[index].errors.extend(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
             )
-            total_amount += line_total
-            db.add(order_item)
-
-    if payload.items and total_amount <= 0:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order total must be positive when items are provided")
-
-    if payload.deposit_amount and payload.deposit_amount > total_amount:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Deposit cannot exceed total amount")
 
-    order.total_amount = total_amount
-    order.deposit_amount = payload.deposit_amount if payload.items else 0
-    order.remaining_amount = max(total_amount - order.deposit_amount, 0)
-
-    db.commit()
-    db.refresh(order)
-    return db.execute(
-        select(Order)
-        .options(
-            selectinload(Order.customer),
-            selectinload(Order.items),
-            selectinload(Order.payments),
-            selectinload(Order.assignments),
-        )
-        .where(Order.id == order.id)
-    ).scalar_one()
+    catalog = await catalog_cache.get(db)
+    priced: list[tuple[int, OrderCreate, list[dict], int]] = []
+    for index, payload in payloads.items():
+        try:
+            item_rows, total_amount = _price_items(payload, catalog)
+        except HTTPException as exc:
+            results[index].errors.append(str(exc.detail))
+            continue
+        priced.append((index, payload, item_rows, total_amount))
+
+    failed = len(raw_payloads) - len(priced)
+    if mode == BulkImportMode.ATOMIC and failed:
+        result = OrderBulkResult(mode=mode, created=0, failed=failed, results=results)
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=result.model_dump(mode="json"))
+
+    for start in range(0, len(priced), BULK_BATCH_SIZE):
+        batch = priced[start : start + BULK_BATCH_SIZE]
+        customer_ids = await upsert_customers(db, [payload.customer for _, payload, _, _ in batch])
+        codes = await order_code_allocator.allocate(db, len(batch))
+        order_rows = [
+            _order_values(payload, code, customer_ids[payload.customer.phone], current_user.id, total_amount)
+            for (_, payload, _, total_amount), code in zip(batch, codes)
+        ]
+        order_ids = dict((await db.execute(insert(Order).returning(Order.code, Order.id), order_rows)).all())
+        item_rows = [
+            {**row, "order_id": order_ids[code]}
+            for (_, _, rows, _), code in zip(batch, codes)
+            for row in rows
+        ]
+        if item_rows:
+            await db.execute(insert(OrderItem), item_rows)
+        for (index, _, _, _), code in zip(batch, codes):
+            results[index] = OrderBulkRowResult(index=index, ok=True, order_id=order_ids[code], code=code)
+    await db.commit()
+
+    return OrderBulkResult(mode=mode, created=len(priced), failed=failed, results=results)
 
 
 @router.post("/{order_id}/assign", response_model=AssignmentRead, summary="Assign florist to order")
-def assign_order(
+async def assign_order(
     order_id: int,
     payload: AssignmentCreate,
-    db: Session = Depends(deps.get_db),
-    _: User = Depends(deps.require_roles(UserRole.BOSS, UserRole.ADMIN)),
+    db: AsyncSession = Depends(deps.get_async_db),
+    _: AuthenticatedUser = Depends(deps.require_roles(UserRole.BOSS, UserRole.ADMIN)),
 ) -> Assignment:
-    order = db.get(Order, order_id)
+    order = await db.get(Order, order_id)
     if order is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
-    assignee = db.get(User, payload.assignee_id)
+    assignee = await db.get(User, payload.assignee_id)
     if assignee is None or assignee.role != UserRole.FLORIST:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Assignee must be a florist")
 
@@ -199,23 +376,19 @@ def assign_order(
     db.add(assignment)
     if order.status in (OrderStatus.NEW, OrderStatus.CONFIRMING):
         order.status = OrderStatus.ASSIGNED
-    db.commit()
-    db.refresh(assignment)
+    await db.commit()
+    await db.refresh(assignment)
     return assignment
 
 
 @router.post("/{order_id}/status", response_model=OrderRead, summary="Update order status")
-def update_order_status(
+async def update_order_status(
     order_id: int,
     payload: OrderStatusUpdate,
-    db: Session = Depends(deps.get_db),
-    _: User = Depends(deps.get_current_active_user),
+    db: AsyncSession = Depends(deps.get_async_db),
+    _: AuthenticatedUser = Depends(deps.get_current_active_user),
 ) -> Order:
-    order = db.execute(
-        select(Order)
-        .options(selectinload(Order.customer), selectinload(Order.items), selectinload(Order.payments), selectinload(Order.assignments))
-        .where(Order.id == order_id)
-    ).scalar_one_or_none()
+    order = await _load_order(db, order_id)
     if order is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
 
@@ -227,103 +400,404 @@ def update_order_status(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status transition")
 
     order.status = payload.status
-    db.commit()
-    db.refresh(order)
-    order.items
-    order.payments
-    order.assignments
+    await db.commit()
+    # Only updated_at changed on the server; the relationships loaded above are still current.
+    await db.refresh(order, attribute_names=["updated_at"])
     return order
 
 
 @router.post("/{order_id}/payments", response_model=PaymentRead, summary="Record payment")
-def record_payment(
+async def record_payment(
     order_id: int,
     payload: PaymentCreate,
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.require_roles(UserRole.SALE, UserRole.BOSS, UserRole.ADMIN)),
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: AuthenticatedUser = Depends(deps.require_roles(UserRole.SALE, UserRole.BOSS, UserRole.ADMIN)),
 ) -> Payment:
-    order = db.execute(
-        select(Order).options(selectinload(Order.payments)).where(Order.id == order_id)
-    ).scalar_one_or_none()
-    if order is None:
+    if not await apply_payment(db, order_id, payload.type, payload.amount):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
 
     payment = Payment(
-        order_id=order.id,
+        order_id=order_id,
         type=payload.type,
         method=payload.method,
         amount=payload.amount,
         paid_at=payload.paid_at,
         recorded_by=current_user.id,
     )
-    order.payments.append(payment)
     db.add(payment)
-    db.flush()
-    _recalculate_financials(order)
-    db.commit()
-    db.refresh(payment)
+    await db.commit()
     return payment
 
 
-@router.get("", response_model=OrderList, summary="List orders")
-def list_orders(
+SUMMARY_COLUMNS = ("id", "code", "status", "receiver_name", "receive_method", "receive_at", "created_at")
+SUMMARY_EXTRA_FIELDS = (
+    "customer_id",
+    "source",
+    "receiver_phone",
+    "address",
+    "card_message",
+    "total_amount",
+    "deposit_amount",
+    "remaining_amount",
+    "updated_at",
+)
+
+
+def apply_order_filters(
+    query: Select,
+    status_filter: OrderStatus | None,
+    date_from: datetime | None,
+    date_to: datetime | None,
+    phone: str | None,
+    join_customer: bool = True,
+) -> Select:
+    if status_filter is not None:
+        query = query.where(Order.status == status_filter)
+    if date_from is not None:
+        query = query.where(Order.created_at >= date_from)
+    if date_to is not None:
+        query = query.where(Order.created_at <= date_to)
+    if phone:
+        if join_customer:
+            query = query.join(Order.customer)
+        query = query.where(customer_phone_condition(phone))
+    return query
+
+
+def _parse_summary_fields(fields: str | None) -> list[str]:
+    if not fields:
+        return []
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(SUMMARY_EXTRA_FIELDS) - set(SUMMARY_COLUMNS))
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown fields: {', '.join(unknown)}")
+    return [name for name in SUMMARY_EXTRA_FIELDS if name in requested]
+
+
+@router.get("", response_model=OrderList | OrderSummaryList, response_model_exclude_unset=True, summary="List orders")
+async def list_orders(
     status_filter: OrderStatus | None = Query(default=None, alias="status"),
     date_from: datetime | None = Query(default=None),
     date_to: datetime | None = Query(default=None),
-    phone: str | None = Query(default=None, description="Customer phone contains"),
+    phone: str | None = Query(default=None, description="Customer phone; a leading 0 or + matches by prefix"),
+    view: OrderView = Query(default=OrderView.FULL, description="full order graph or compact summary rows"),
+    fields: str | None = Query(default=None, description="Comma-separated extra columns for view=summary"),
+    cursor: str | None = Query(default=None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(default=True, description="Set to false to skip counting matching orders"),
+    count_mode: CountMode = Query(default=CountMode.EXACT, alias="count", description="How total is computed"),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=50, ge=1, le=100),
-    db: Session = Depends(deps.get_db),
-    _: User = Depends(deps.get_current_active_user),
-) -> OrderList:
-    query = (
-        select(Order)
-        .options(
+    db: AsyncSession = Depends(deps.get_async_db),
+    _: AuthenticatedUser = Depends(deps.get_current_active_user),
+) -> ModelResponse:
+    if view == OrderView.SUMMARY:
+        columns = [*SUMMARY_COLUMNS, *_parse_summary_fields(fields)]
+        query = select(*(getattr(Order, name) for name in columns))
+    else:
+        query = select(Order).options(
             selectinload(Order.customer),
             selectinload(Order.items),
             selectinload(Order.payments),
             selectinload(Order.assignments),
         )
-        .order_by(Order.created_at.desc())
+    query = apply_order_filters(query, status_filter, date_from, date_to, phone).order_by(
+        Order.created_at.desc(), Order.id.desc()
     )
-    count_query = select(func.count()).select_from(Order)
 
-    if status_filter is not None:
-        query = query.where(Order.status == status_filter)
-        count_query = count_query.where(Order.status == status_filter)
+    if include_total:
+        count_query = apply_order_filters(select(Order.id), status_filter, date_from, date_to, phone)
+        total, total_mode = await count_total(db, count_query, count_mode)
+    else:
+        total, total_mode = None, None
+
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                Order.created_at < cursor_created_at,
+                and_(Order.created_at == cursor_created_at, Order.id < cursor_id),
+            )
+        )
+    else:
+        query = query.offset(skip)
 
-    if date_from is not None:
-        query = query.where(Order.created_at >= date_from)
-        count_query = count_query.where(Order.created_at >= date_from)
-    if date_to is not None:
-        query = query.where(Order.created_at <= date_to)
-        count_query = count_query.where(Order.created_at <= date_to)
+    result = await db.execute(query.limit(limit + 1))
+    if view == OrderView.SUMMARY:
+        rows = [OrderSummary(**row) for row in result.mappings()]
+    else:
+        rows = result.scalars().unique().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
 
-    if phone:
-        query = query.join(Order.customer).where(Customer.phone.contains(phone))
-        count_query = count_query.join(Customer).where(Customer.phone.contains(phone))
+    page_model = OrderSummaryList if view == OrderView.SUMMARY else OrderList
+    page = page_model(total=total, total_mode=total_mode, skip=skip, limit=limit, next_cursor=next_cursor, items=rows)
+    return ModelResponse(page, exclude_unset=True)
 
-    total = db.execute(count_query).scalar_one()
-    orders = db.execute(query.offset(skip).limit(limit)).scalars().unique().all()
-    return OrderList(total=total, skip=skip, limit=limit, items=orders)
+
+SCHEDULE_BUCKET_UNITS = {"m": 60, "h": 3600, "d": 86400}
+SCHEDULE_MAX_BUCKETS = 500
+SCHEDULE_SUMMARY_COLUMNS = (*SUMMARY_COLUMNS, "address")
+
+
+def _parse_bucket(bucket: str) -> int:
+    match = re.fullmatch(r"(\d+)([mhd])", bucket.strip())
+    seconds = int(match.group(1)) * SCHEDULE_BUCKET_UNITS[match.group(2)] if match else 0
+    if seconds < 300:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Bucket must look like 15m, 1h or 1d and be at least 5m"
+        )
+    return seconds
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _bucket_index(dialect_name: str, start: datetime, bucket_seconds: int) -> ColumnElement[int]:
+    # Buckets are aligned to the requested window start, so local midnights line up
+    # whatever the client's UTC offset is.
+    offset = int(start.timestamp())
+    if dialect_name == "postgresql":
+        # EXTRACT(epoch) is numeric, so floor explicitly before the cast rounds.
+        return cast(func.floor((func.extract("epoch", Order.receive_at) - offset) / bucket_seconds), Integer)
+    # receive_at >= start, so integer division already floors.
+    return (cast(func.strftime("%s", Order.receive_at), Integer) - offset) // bucket_seconds
+
+
+def _schedule_summaries(
+    dialect_name: str,
+    slots: list[tuple[int, datetime, datetime]],
+    conditions: list[ColumnElement[bool]],
+    per_bucket: int,
+) -> Select:
+    """The first per_bucket order summaries of each (bucket, start, end) slot.
+
+    Every slot gets its own receive_at range scan that stops after per_bucket rows, so
+    a wide window never reads every order it covers. PostgreSQL runs that as a LATERAL
+    join; SQLite has no LATERAL but evaluates the correlated IN (... LIMIT) once per slot.
+    """
+    def bound(value: object, type_: TypeEngine) -> ColumnElement:
+        # PostgreSQL cannot infer the type of a bare parameter in a SELECT list; SQLite
+        # compares the stored text, which CAST(... AS DATETIME) would turn into a number.
+        return cast(literal(value, type_), type_) if dialect_name == "postgresql" else literal(value, type_)
+
+    slot_rows = union_all(
+        *(
+            select(
+                bound(index, Integer()).label("bucket"),
+                bound(slot_start, Order.receive_at.type).label("slot_start"),
+                bound(slot_end, Order.receive_at.type).label("slot_end"),
+            )
+            for index, slot_start, slot_end in slots
+        )
+    ).cte("slots")
+    in_slot = [*conditions, Order.receive_at >= slot_rows.c.slot_start, Order.receive_at < slot_rows.c.slot_end]
+    columns = [getattr(Order, name) for name in SCHEDULE_SUMMARY_COLUMNS]
+    if dialect_name == "postgresql":
+        capped = (
+            select(*columns).where(*in_slot).order_by(Order.receive_at, Order.id).limit(per_bucket).lateral("capped")
+        )
+        return select(slot_rows.c.bucket, *capped.c).select_from(slot_rows).join(capped, true())
+    capped_ids = (
+        select(Order.id)
+        .where(*in_slot)
+        .order_by(Order.receive_at, Order.id)
+        .limit(per_bucket)
+        .correlate(slot_rows)
+    )
+    return select(slot_rows.c.bucket, *columns).select_from(slot_rows).join(Order, Order.id.in_(capped_ids))
+
+
+@router.get("/schedule", response_model=OrderSchedule, summary="Orders to deliver or hand over, by time slot")
+async def get_order_schedule(
+    start: datetime = Query(..., alias="from", description="Window start; buckets are aligned to it"),
+    end: datetime = Query(..., alias="to", description="Window end (exclusive)"),
+    bucket: str = Query(default="1h", description="Bucket width such as 15m, 1h or 1d"),
+    receive_method: ReceiveMethod | None = Query(default=None),
+    include_cancelled: bool = Query(default=False),
+    per_bucket: int = Query(default=20, ge=0, le=200, description="Order summaries returned per bucket"),
+    db: AsyncSession = Depends(deps.get_async_db),
+    _: AuthenticatedUser = Depends(deps.get_current_active_user),
+) -> ModelResponse:
+    start, end = _as_utc(start), _as_utc(end)
+    bucket_seconds = _parse_bucket(bucket)
+    bucket_count = math.ceil((end - start) / timedelta(seconds=bucket_seconds))
+    if bucket_count <= 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'to' must be after 'from'")
+    if bucket_count > SCHEDULE_MAX_BUCKETS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Too many buckets for this window")
+
+    conditions = [Order.receive_at >= start, Order.receive_at < end]
+    if receive_method is not None:
+        conditions.append(Order.receive_method == receive_method)
+    if not include_cancelled:
+        conditions.append(Order.status != OrderStatus.CANCELLED)
+    bucket_index = _bucket_index(db.get_bind().dialect.name, start, bucket_seconds)
+
+    slotted = select(bucket_index.label("bucket"), Order.receive_method).where(*conditions).subquery()
+    counts = await db.execute(
+        select(slotted.c.bucket, slotted.c.receive_method, func.count())
+        .group_by(slotted.c.bucket, slotted.c.receive_method)
+    )
+    buckets = [
+        OrderScheduleBucket(
+            start=start + timedelta(seconds=index * bucket_seconds),
+            end=min(start + timedelta(seconds=(index + 1) * bucket_seconds), end),
+            total=0,
+            by_method={},
+            orders=[],
+        )
+        for index in range(bucket_count)
+    ]
+    for index, method, count in counts:
+        # The SQL index works in whole seconds, so an order in the last fraction of a second
+        # before a fractional 'to' can land one past the final bucket.
+        slot = buckets[min(index, bucket_count - 1)]
+        slot.total += count
+        if method is not None:
+            slot.by_method[method] = count
+
+    occupied = [index for index, slot in enumerate(buckets) if slot.total]
+    if per_bucket and occupied:
+        rows = await db.execute(
+            _schedule_summaries(
+                db.get_bind().dialect.name,
+                [(index, buckets[index].start, buckets[index].end) for index in occupied],
+                conditions,
+                per_bucket,
+            )
+        )
+        for row in sorted(rows.mappings(), key=lambda row: (row["receive_at"], row["id"])):
+            buckets[row["bucket"]].orders.append(
+                OrderSummary(**{name: row[name] for name in SCHEDULE_SUMMARY_COLUMNS})
+            )
+
+    schedule = OrderSchedule(
+        start=start,
+        end=end,
+        bucket_seconds=bucket_seconds,
+        total=sum(slot.total for slot in buckets),
+        buckets=buckets,
+    )
+    return ModelResponse(schedule, exclude_unset=True)
+
+
+def _bom_lines(
+    dialect_name: str,
+) -> tuple[FromClause, ColumnElement[int], ColumnElement[Decimal], ColumnElement[bool]]:
+    """One row per BOM snapshot entry of an order item: component id, per-unit qty and a guard
+    that skips items whose snapshot is not a JSON array."""
+    if dialect_name == "postgresql":
+        lines = func.jsonb_array_elements(OrderItem.bom_snapshot).table_valued(column("value", JSONB))
+        return (
+            lines,
+            cast(lines.c.value["component_sku_id"].astext, Integer),
+            cast(lines.c.value["qty"].astext, Numeric(18, 6)),
+            func.jsonb_typeof(OrderItem.bom_snapshot) == "array",
+        )
+    lines = func.json_each(OrderItem.bom_snapshot).table_valued("value")
+    return (
+        lines,
+        cast(func.json_extract(lines.c.value, "$.component_sku_id"), Integer),
+        cast(func.json_extract(lines.c.value, "$.qty"), Numeric(18, 6)),
+        func.json_type(OrderItem.bom_snapshot) == "array",
+    )
+
+
+@router.get("/component-demand", response_model=ComponentDemandReport, summary="Component demand of open orders")
+async def get_component_demand(
+    start: datetime = Query(..., alias="from", description="Receive window start"),
+    end: datetime = Query(..., alias="to", description="Receive window end (exclusive)"),
+    tracked_only: bool = Query(default=True, description="Only components with track_stock set"),
+    db: AsyncSession = Depends(deps.get_async_db),
+    _: AuthenticatedUser = Depends(deps.get_current_active_user),
+) -> ModelResponse:
+    start, end = _as_utc(start), _as_utc(end)
+    if end <= start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'to' must be after 'from'")
+
+    # Matches the partial receive_at index, which only covers open orders.
+    window = [Order.receive_at >= start, Order.receive_at < end, OPEN_ORDER_CONDITION]
+    lines, component_sku_id, unit_qty, has_lines = _bom_lines(db.get_bind().dialect.name)
+    exploded = (
+        select(
+            component_sku_id.label("component_sku_id"),
+            func.sum(unit_qty * OrderItem.qty).label("qty"),
+            func.count(func.distinct(Order.id)).label("order_count"),
+        )
+        .select_from(Order)
+        .join(OrderItem, (OrderItem.order_id == Order.id) & has_lines)
+        .join(lines, true())
+        .where(*window)
+        .group_by(component_sku_id)
+        .subquery()
+    )
+    query = (
+        select(Sku.id, Sku.code, Sku.name, Sku.unit, Sku.track_stock, exploded.c.qty, exploded.c.order_count)
+        .join(exploded, exploded.c.component_sku_id == Sku.id)
+    )
+    if tracked_only:
+        query = query.where(Sku.track_stock.is_(True))
+    # One row per component, so sorting here is cheaper than another pass in the database.
+    rows = sorted((await db.execute(query)).all(), key=lambda row: (-row.qty, row.id))
+    order_count = (await db.execute(select(func.count()).select_from(Order).where(*window))).scalar_one()
+
+    report = ComponentDemandReport(
+        start=start,
+        end=end,
+        order_count=order_count,
+        components=[
+            ComponentDemand(
+                component_sku_id=sku_id,
+                code=code,
+                name=name,
+                unit=unit,
+                track_stock=track_stock,
+                qty=Decimal(qty).quantize(Decimal("0.001")),
+                order_count=orders,
+            )
+            for sku_id, code, name, unit, track_stock, qty, orders in rows
+        ],
+    )
+    return ModelResponse(report)
+
+
+async def _order_version(db: AsyncSession, order_id: int) -> ResourceVersion | None:
+    # Payments always update the order row and items never change after creation,
+    # so the order, its customer and its assignments cover everything in OrderRead.
+    assignment_count = select(func.count(Assignment.id)).where(Assignment.order_id == Order.id).scalar_subquery()
+    assignment_updated_at = (
+        select(func.max(Assignment.updated_at)).where(Assignment.order_id == Order.id).scalar_subquery()
+    )
+    row = (
+        await db.execute(
+            select(Order.updated_at, Customer.updated_at, assignment_count, assignment_updated_at)
+            .join(Order.customer)
+            .where(Order.id == order_id)
+        )
+    ).one_or_none()
+    if row is None:
+        return None
+    timestamps = [value for value in (row[0], row[1], row[3]) if value is not None]
+    return ResourceVersion("order", order_id, *row, last_modified=max(timestamps))
 
 
 @router.get("/{order_id}", response_model=OrderRead, summary="Get order detail")
-def get_order(
+async def get_order(
     order_id: int,
-    db: Session = Depends(deps.get_db),
-    _: User = Depends(deps.get_current_active_user),
-) -> Order:
-    order = db.execute(
-        select(Order)
-        .options(
-            selectinload(Order.customer),
-            selectinload(Order.items),
-            selectinload(Order.payments),
-            selectinload(Order.assignments),
-        )
-        .where(Order.id == order_id)
-    ).scalar_one_or_none()
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    _: AuthenticatedUser = Depends(deps.get_current_active_user),
+) -> Response:
+    version = await _order_version(db, order_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    if version.matches(request):
+        return version.not_modified()
+
+    order = await _load_order(db, order_id)
     if order is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
-    return order
+    return ModelResponse(OrderRead.model_validate(order), headers=version.headers)
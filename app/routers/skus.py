@@ -1,39 +1,51 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import deps
+from app.core.bom import BomCycleError
+from app.core.catalog import CatalogBomLine, CatalogSku, catalog_cache
 from app.db.models.skus import Sku, SkuAlias, SkuBom
 from app.db.models.users import UserRole
-from app.schemas.skus import SkuAliasCreate, SkuAliasRead, SkuBomComponent, SkuCreate, SkuRead
+from app.schemas.skus import (
+    CatalogCacheStats,
+    SkuAliasCreate,
+    SkuAliasRead,
+    SkuBomComponent,
+    SkuBomExplodedLine,
+    SkuBomUpsert,
+    SkuCandidate,
+    SkuCreate,
+    SkuRead,
+)
 
 router = APIRouter(prefix="/skus", tags=["skus"])
 
 
 @router.get("", response_model=list[SkuRead], summary="List SKUs")
-def list_skus(
+async def list_skus(
     is_template: bool | None = Query(default=None),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=50, ge=1, le=100),
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     _: object = Depends(deps.get_current_active_user),
-) -> list[Sku]:
-    query = select(Sku).order_by(Sku.created_at.desc())
+) -> list[CatalogSku]:
+    catalog = await catalog_cache.get(db)
+    skus = catalog.newest_first
     if is_template is not None:
-        query = query.where(Sku.is_template.is_(is_template))
-    skus = db.execute(query.offset(skip).limit(limit)).scalars().all()
-    return skus
+        skus = [sku for sku in skus if sku.is_template is is_template]
+    return list(skus[skip : skip + limit])
 
 
 @router.post("", response_model=SkuRead, summary="Create SKU")
-def create_sku(
+async def create_sku(
     payload: SkuCreate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     _: object = Depends(deps.require_roles(UserRole.ADMIN, UserRole.BOSS)),
 ) -> Sku:
-    existing = db.execute(select(Sku).where(Sku.code == payload.code)).scalar_one_or_none()
+    existing = (await db.execute(select(Sku).where(Sku.code == payload.code))).scalar_one_or_none()
     if existing is not None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="SKU code already exists")
 
@@ -48,60 +60,153 @@ def create_sku(
         is_active=payload.is_active,
     )
     db.add(sku)
-    db.commit()
-    db.refresh(sku)
+    await db.commit()
+    await db.refresh(sku)
     return sku
 
 
+@router.get("/resolve", response_model=list[SkuCandidate], summary="Rank SKUs matching free text")
+async def resolve_skus(
+    q: str = Query(..., min_length=1, max_length=255),
+    is_template: bool | None = Query(default=None),
+    limit: int = Query(default=10, ge=1, le=50),
+    db: AsyncSession = Depends(deps.get_async_db),
+    _: object = Depends(deps.get_current_active_user),
+) -> list[SkuCandidate]:
+    catalog = await catalog_cache.get(db)
+    allowed = {
+        sku.id
+        for sku in catalog.skus.values()
+        if sku.is_active and (is_template is None or sku.is_template is is_template)
+    }
+    candidates = []
+    for match in catalog.resolver.resolve(q, limit=limit, allowed=allowed):
+        sku = catalog.skus[match.sku_id]
+        candidates.append(
+            SkuCandidate(
+                sku_id=sku.id,
+                code=sku.code,
+                name=sku.name,
+                is_template=sku.is_template,
+                base_price=sku.base_price,
+                score=match.score,
+                matched=match.matched,
+                matched_field=match.matched_field,
+            )
+        )
+    return candidates
+
+
+@router.get("/catalog-cache", response_model=CatalogCacheStats, summary="Catalog cache metrics for this worker")
+async def get_catalog_cache_stats(
+    _: object = Depends(deps.require_roles(UserRole.ADMIN, UserRole.BOSS)),
+) -> dict[str, int | None]:
+    return catalog_cache.stats()
+
+
 @router.get("/{sku_id}/bom", response_model=list[SkuBomComponent], summary="Get SKU bill of materials")
-def get_sku_bom(
+async def get_sku_bom(
     sku_id: int,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     _: object = Depends(deps.get_current_active_user),
-) -> list[SkuBomComponent]:
-    sku = db.get(Sku, sku_id)
-    if sku is None:
+) -> list[CatalogBomLine]:
+    catalog = await catalog_cache.get(db)
+    if sku_id not in catalog.skus:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SKU not found")
-    bom_rows = (
-        db.execute(
-            select(SkuBom)
-            .options(joinedload(SkuBom.component))
-            .where(SkuBom.parent_sku_id == sku_id)
+    return list(catalog.bom.get(sku_id, ()))
+
+
+@router.put("/{sku_id}/bom", response_model=SkuBomComponent, summary="Add or update a BOM component")
+async def upsert_sku_bom_component(
+    sku_id: int,
+    payload: SkuBomUpsert,
+    db: AsyncSession = Depends(deps.get_async_db),
+    _: object = Depends(deps.require_roles(UserRole.ADMIN, UserRole.BOSS)),
+) -> SkuBomComponent:
+    sku = await db.get(Sku, sku_id)
+    component = await db.get(Sku, payload.component_sku_id)
+    if sku is None or component is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SKU not found")
+    row = (
+        await db.execute(
+            select(SkuBom).where(SkuBom.parent_sku_id == sku_id, SkuBom.component_sku_id == component.id)
         )
-        .scalars()
-        .all()
+    ).scalar_one_or_none()
+    if row is None:
+        row = SkuBom(parent_sku_id=sku_id, component_sku_id=component.id)
+        db.add(row)
+    row.qty = payload.qty
+    row.uom = payload.uom
+    try:
+        await db.commit()
+    except BomCycleError as exc:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return SkuBomComponent(
+        id=row.id,
+        component_sku_id=component.id,
+        component_code=component.code,
+        component_name=component.name,
+        qty=payload.qty,
+        uom=payload.uom,
     )
-    return [
-        SkuBomComponent(
-            id=row.id,
-            component_sku_id=row.component_sku_id,
-            component_code=row.component.code,
-            component_name=row.component.name,
-            qty=row.qty,
-            uom=row.uom,
+
+
+@router.delete(
+    "/{sku_id}/bom/{component_sku_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Remove a BOM component"
+)
+async def delete_sku_bom_component(
+    sku_id: int,
+    component_sku_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    _: object = Depends(deps.require_roles(UserRole.ADMIN, UserRole.BOSS)),
+) -> Response:
+    row = (
+        await db.execute(
+            select(SkuBom).where(SkuBom.parent_sku_id == sku_id, SkuBom.component_sku_id == component_sku_id)
         )
-        for row in bom_rows
-    ]
+    ).scalar_one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="BOM component not found")
+    await db.delete(row)
+    await db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get(
+    "/{sku_id}/bom/exploded",
+    response_model=list[SkuBomExplodedLine],
+    summary="Get leaf components with effective quantities across all BOM levels",
+)
+async def get_sku_bom_exploded(
+    sku_id: int,
+    db: AsyncSession = Depends(deps.get_async_db),
+    _: object = Depends(deps.get_current_active_user),
+) -> list[dict]:
+    catalog = await catalog_cache.get(db)
+    if sku_id not in catalog.skus:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SKU not found")
+    return catalog.bom_snapshot(sku_id)
 
 
 @router.post("/{sku_id}/aliases", response_model=SkuAliasRead, summary="Create SKU alias")
-def create_sku_alias(
+async def create_sku_alias(
     sku_id: int,
     payload: SkuAliasCreate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     _: object = Depends(deps.require_roles(UserRole.ADMIN, UserRole.BOSS)),
 ) -> SkuAlias:
-    sku = db.get(Sku, sku_id)
+    sku = await db.get(Sku, sku_id)
     if sku is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="SKU not found")
-    existing = db.execute(
-        select(SkuAlias).where(SkuAlias.sku_id == sku_id, SkuAlias.alias == payload.alias)
+    existing = (
+        await db.execute(select(SkuAlias).where(SkuAlias.sku_id == sku_id, SkuAlias.alias == payload.alias))
     ).scalar_one_or_none()
     if existing is not None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Alias already exists")
 
     alias = SkuAlias(sku_id=sku_id, alias=payload.alias)
     db.add(alias)
-    db.commit()
-    db.refresh(alias)
+    await db.commit()
+    await db.refresh(alias)
     return alias
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import enum
 import re
 from datetime import datetime, timezone
 
@@ -8,6 +9,12 @@ from pydantic import BaseModel, Field, field_validator
 PHONE_REGEX = re.compile(r"^(?:\+?\d{9,15}|0\d{8,10})$")
 
 
+class CountMode(str, enum.Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    CACHED = "cached"
+
+
 class PhoneNumberMixin(BaseModel):
     phone: str = Field(..., description="Vietnam phone number")
 
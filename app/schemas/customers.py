@@ -4,7 +4,7 @@ from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from app.schemas.common import PhoneNumberMixin
+from app.schemas.common import CountMode, PhoneNumberMixin
 
 
 class CustomerUpsert(PhoneNumberMixin):
@@ -26,6 +26,7 @@ class CustomerRead(BaseModel):
 
 class CustomerList(BaseModel):
     total: int
+    total_mode: CountMode
     skip: int
     limit: int
     items: list[CustomerRead]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import enum
 from datetime import datetime
 from decimal import Decimal
 
@@ -14,7 +15,7 @@ from app.db.models.orders import (
     PaymentType,
     ReceiveMethod,
 )
-from app.schemas.common import FutureDateTimeMixin, PhoneNumberMixin
+from app.schemas.common import CountMode, FutureDateTimeMixin, PhoneNumberMixin
 from app.schemas.customers import CustomerRead
 
 
@@ -35,7 +36,7 @@ class ReceiverInput(BaseModel):
         return PhoneNumberMixin.validate_phone(value)  # type: ignore[arg-type]
 
 
-class DeliveryInput(BaseModel, FutureDateTimeMixin):
+class DeliveryInput(FutureDateTimeMixin):
     method: ReceiveMethod
     receive_at_iso: datetime
     address: str | None = Field(default=None, max_length=1024)
@@ -145,14 +146,103 @@ class OrderRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-
-
 class OrderList(BaseModel):
-    total: int
+    total: int | None
+    total_mode: CountMode | None = None
     skip: int
     limit: int
+    next_cursor: str | None = None
     items: list[OrderRead]
 
+
+class OrderView(str, enum.Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+
+class OrderSummary(BaseModel):
+    id: int
+    code: str
+    status: OrderStatus
+    receiver_name: str
+    receive_method: ReceiveMethod | None
+    receive_at: datetime | None
+    created_at: datetime
+    customer_id: int | None = None
+    source: OrderSource | None = None
+    receiver_phone: str | None = None
+    address: str | None = None
+    card_message: str | None = None
+    total_amount: int | None = None
+    deposit_amount: int | None = None
+    remaining_amount: int | None = None
+    updated_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderSummaryList(BaseModel):
+    total: int | None
+    total_mode: CountMode | None = None
+    skip: int
+    limit: int
+    next_cursor: str | None = None
+    items: list[OrderSummary]
+
+
+class OrderScheduleBucket(BaseModel):
+    start: datetime
+    end: datetime
+    total: int
+    by_method: dict[ReceiveMethod, int]
+    orders: list[OrderSummary]
+
+
+class OrderSchedule(BaseModel):
+    start: datetime
+    end: datetime
+    bucket_seconds: int
+    total: int
+    buckets: list[OrderScheduleBucket]
+
+
+class ComponentDemand(BaseModel):
+    component_sku_id: int
+    code: str
+    name: str
+    unit: str | None
+    track_stock: bool
+    qty: Decimal
+    order_count: int
+
+
+class ComponentDemandReport(BaseModel):
+    start: datetime
+    end: datetime
+    order_count: int
+    components: list[ComponentDemand]
+
+
+class BulkImportMode(str, enum.Enum):
+    ATOMIC = "atomic"
+    BEST_EFFORT = "best_effort"
+
+
+class OrderBulkRowResult(BaseModel):
+    index: int
+    ok: bool
+    order_id: int | None = None
+    code: str | None = None
+    errors: list[str] = Field(default_factory=list)
+
+
+class OrderBulkResult(BaseModel):
+    mode: BulkImportMode
+    created: int
+    failed: int
+    results: list[OrderBulkRowResult]
+
+
 class OrderStatusUpdate(BaseModel):
     status: OrderStatus
 
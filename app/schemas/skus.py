@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from decimal import Decimal
+from typing import Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -52,3 +53,35 @@ class SkuBomComponent(BaseModel):
     uom: str | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SkuBomUpsert(BaseModel):
+    component_sku_id: int
+    qty: Decimal = Field(..., gt=0, max_digits=12, decimal_places=3)
+    uom: str | None = Field(default=None, max_length=64)
+
+
+class SkuBomExplodedLine(BaseModel):
+    component_sku_id: int
+    component_code: str
+    component_name: str
+    qty: Decimal
+    uom: str | None = None
+
+
+class CatalogCacheStats(BaseModel):
+    version: int | None
+    skus: int
+    hits: int
+    misses: int
+
+
+class SkuCandidate(BaseModel):
+    sku_id: int
+    code: str
+    name: str
+    is_template: bool
+    base_price: int
+    score: float
+    matched: str
+    matched_field: Literal["code", "name", "alias"]
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+from collections.abc import Iterator
+from contextlib import closing, contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Settings are read at import time; benchmark databases come from --database-url instead.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+os.environ.setdefault("ORDER_CODE_SECRET", "benchmark")
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine, func, make_url, select, text, update  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.core import deps  # noqa: E402
+from app.core.auth_cache import user_cache  # noqa: E402
+from app.core.catalog import catalog_cache  # noqa: E402
+from app.core.config import get_async_database_url  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.models.orders import Order  # noqa: E402
+from app.db.models.users import User, UserRole  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.baseline import BASELINE_DIR, find_regressions, load_baseline, result_key, save_baseline  # noqa: E402
+from benchmarks.runner import count_queries, run_level  # noqa: E402
+from benchmarks.scenarios import BENCH_PASSWORD, BENCH_USER, SCENARIOS, WRITE_SCENARIOS, Fixtures  # noqa: E402
+from scripts.generate_dataset import DatasetConfig, generate  # noqa: E402
+
+DEFAULT_DATABASE_URL = f"sqlite:///{Path(tempfile.gettempdir()) / 'florist-bench-{orders}.sqlite3'}"
+
+
+def prepare_database(url: str, orders: int, seed: int) -> Fixtures:
+    """Seed the database once per size; later runs reuse it so baselines stay comparable."""
+    engine = create_engine(url)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        if not connection.execute(select(func.count()).select_from(Order)).scalar_one():
+            print(f"Generating {orders} orders into {engine.url.render_as_string(hide_password=True)} ...")
+            generate(connection, DatasetConfig(customers=max(orders // 5, 100), orders=orders, seed=seed))
+        # Hashed on every run, so the login scenario always verifies at the configured bcrypt rounds.
+        hashed_password = get_password_hash(BENCH_PASSWORD)
+        if connection.execute(select(User.id).where(User.name == BENCH_USER)).first() is None:
+            connection.execute(
+                User.__table__.insert().values(
+                    name=BENCH_USER, role=UserRole.ADMIN, hashed_password=hashed_password, is_active=True
+                )
+            )
+        else:
+            connection.execute(update(User).where(User.name == BENCH_USER).values(hashed_password=hashed_password))
+        fixtures = Fixtures.sample(connection)
+    engine.dispose()
+    return fixtures
+
+
+@contextmanager
+def working_copy(url: str) -> Iterator[str]:
+    """Yield the URL of a throwaway copy of the seeded database, dropped afterwards.
+
+    Write scenarios run against it, so every run starts from the same rows
+    and the seeded database never grows.
+    """
+    source = make_url(url)
+    if source.get_backend_name() == "sqlite":
+        if source.database in (None, "", ":memory:"):
+            raise SystemExit("Write scenarios need a file-backed SQLite database.")
+        path = Path(source.database)
+        copy = path.with_name(f"{path.stem}-run{path.suffix}")
+        with closing(sqlite3.connect(path)) as original, closing(sqlite3.connect(copy)) as target:
+            original.backup(target)
+        try:
+            yield source.set(database=str(copy)).render_as_string(hide_password=False)
+        finally:
+            copy.unlink(missing_ok=True)
+        return
+
+    name = f"{source.database}_run"
+    admin = create_engine(source.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as connection:
+        connection.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+        connection.execute(text(f'CREATE DATABASE "{name}" TEMPLATE "{source.database}"'))
+    try:
+        yield source.set(database=name).render_as_string(hide_password=False)
+    finally:
+        with admin.connect() as connection:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+        admin.dispose()
+
+
+async def run_scenario(
+    url: str, name: str, orders: int, fixtures: Fixtures, args: argparse.Namespace
+) -> dict[str, dict]:
+    async_engine = create_async_engine(get_async_database_url(url), pool_pre_ping=True)
+    sync_engine = create_engine(url, pool_pre_ping=True)
+    count_queries(async_engine)
+    sessions = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def get_async_db():
+        async with sessions() as db:
+            yield db
+
+    def get_db():
+        with Session(bind=sync_engine, autoflush=False, expire_on_commit=False) as db:
+            yield db
+
+    app.dependency_overrides[deps.get_async_db] = get_async_db
+    app.dependency_overrides[deps.get_db] = get_db
+    # Both caches are per process and keyed without the database, so a previous run must not leak in.
+    catalog_cache.clear()
+    user_cache.clear()
+
+    results: dict[str, dict] = {}
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    headers = {"Authorization": f"Bearer {create_access_token(BENCH_USER, UserRole.ADMIN.value)}"}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            # Warm the pool and the per-process caches before anything is timed.
+            await run_level(client, SCENARIOS[name], fixtures, 1, args.warmup, args.seed)
+            for concurrency in args.concurrency:
+                result = await run_level(client, SCENARIOS[name], fixtures, concurrency, args.requests, args.seed)
+                results[result_key(name, orders, concurrency)] = result
+                print(
+                    f"{name:>16} {orders:>9} {concurrency:>5} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                    f"{result['p99_ms']:>9.2f} {result['rps']:>8.1f} {result['queries_per_request']:>7.2f} "
+                    f"{result['errors']:>6}"
+                )
+    finally:
+        app.dependency_overrides.clear()
+        await async_engine.dispose()
+        sync_engine.dispose()
+    return results
+
+
+async def run_size(url: str, orders: int, fixtures: Fixtures, args: argparse.Namespace) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    for name in args.scenario or list(SCENARIOS):
+        # Reads share the seeded database; each write scenario gets a fresh copy of it.
+        with working_copy(url) if name in WRITE_SCENARIOS else nullcontext(url) as scenario_url:
+            results.update(await run_scenario(scenario_url, name, orders, fixtures, args))
+    return results
+
+
+async def main(args: argparse.Namespace) -> int:
+    results: dict[str, dict] = {}
+    print(
+        f"{'scenario':>16} {'orders':>9} {'conc':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'req/s':>8} {'queries':>7} {'errors':>6}"
+    )
+    for orders in args.orders:
+        url = args.database_url.format(orders=orders)
+        fixtures = prepare_database(url, orders, args.seed)
+        results.update(await run_size(url, orders, fixtures, args))
+
+    path = args.baseline if args.baseline.suffix else BASELINE_DIR / f"{args.baseline}.json"
+    baseline = load_baseline(path)
+    if baseline is None or args.update_baseline:
+        meta = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "dialect": create_engine(args.database_url.format(orders=args.orders[0])).dialect.name,
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "seed": args.seed,
+        }
+        save_baseline(path, meta, results)
+        print(f"Baseline written to {path}.")
+        return 0
+
+    regressions = find_regressions(baseline["results"], results, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regressions against {path} (threshold {args.threshold:.0%}).")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the main API endpoints in-process against seeded databases of several sizes. "
+        "The first run writes a JSON baseline; later runs compare against it and exit 1 on regressions.",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=DEFAULT_DATABASE_URL,
+        help="One database per size; '{orders}' is replaced by the size. PostgreSQL databases must be migrated.",
+    )
+    parser.add_argument("--orders", type=int, nargs="+", default=[10_000, 100_000], help="Dataset sizes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Repeat to run several")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", type=Path, default=Path("default"), help="Baseline name or path to a JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown, 0.2 = 20%%")
+    sys.exit(asyncio.run(main(parser.parse_args())))
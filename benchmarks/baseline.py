@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+# Query counts barely vary between runs, so any extra statement on average is a regression.
+QUERY_TOLERANCE = 0.5
+
+
+def result_key(scenario: str, orders: int, concurrency: int) -> str:
+    return f"{scenario}/orders={orders}/concurrency={concurrency}"
+
+
+def load_baseline(path: Path) -> dict | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_baseline(path: Path, meta: dict, results: dict[str, dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"meta": meta, "results": results}, indent=2, sort_keys=True) + "\n")
+
+
+def find_regressions(baseline: dict[str, dict], results: dict[str, dict], threshold: float) -> list[str]:
+    """Describe every metric that got worse than its baseline by more than ``threshold``.
+
+    Latencies may grow and throughput may drop by the fraction ``threshold``;
+    queries per request may grow by ``QUERY_TOLERANCE``. Keys missing from
+    either side are ignored, so adding scenarios or levels does not fail a run.
+    """
+    regressions: list[str] = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in LATENCY_METRICS:
+            if current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(f"{key}: {metric} {previous[metric]} -> {current[metric]}")
+        if current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(f"{key}: rps {previous['rps']} -> {current['rps']}")
+        if current["queries_per_request"] > previous["queries_per_request"] + QUERY_TOLERANCE:
+            regressions.append(
+                f"{key}: queries_per_request {previous['queries_per_request']} -> {current['queries_per_request']}"
+            )
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{key}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
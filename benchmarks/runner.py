@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmarks.scenarios import BenchRequest, Fixtures
+
+# One counter per in-flight request; tasks and threads started while serving it copy the context.
+_query_count: ContextVar[list[int] | None] = ContextVar("benchmark_query_count", default=None)
+
+
+def _count_query(*args: object) -> None:
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def count_queries(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _count_query)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    # Nearest rank, so p99 of 100 samples is the slowest but one rather than an interpolation.
+    return sorted_values[max(math.ceil(fraction * len(sorted_values)) - 1, 0)]
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    make_request: Callable[[random.Random, Fixtures], BenchRequest],
+    fixtures: Fixtures,
+    concurrency: int,
+    total: int,
+    seed: int,
+) -> dict[str, float]:
+    rng = random.Random(seed)
+    requests = [make_request(rng, fixtures) for _ in range(total)]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    queries: list[int] = []
+    errors = 0
+
+    async def one(request: BenchRequest) -> None:
+        nonlocal errors
+        async with semaphore:
+            counter = [0]
+            _query_count.set(counter)
+            started = time.perf_counter()
+            response = await client.request(request.method, request.path, json=request.json, data=request.data)
+            latencies.append(time.perf_counter() - started)
+            queries.append(counter[0])
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(request) for request in requests))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "rps": round(total / elapsed, 1),
+        "queries_per_request": round(sum(queries) / total, 2),
+        "errors": errors,
+    }
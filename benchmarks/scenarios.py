@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Connection, func, select
+
+from app.db.models.customers import Customer
+from app.db.models.orders import Order
+from app.db.models.skus import Sku
+
+BENCH_USER = "bench-admin"
+BENCH_PASSWORD = "bench-password"
+NAME_QUERIES = ["nguyen", "tran van", "le thi", "pham", "hoang minh", "vo ngoc", "lan", "bao"]
+
+
+@dataclass(frozen=True)
+class Fixtures:
+    """Ids sampled from the seeded database that the scenarios pick from."""
+
+    order_ids: list[int]
+    template_ids: list[int]
+    customer_phones: list[str]
+
+    @classmethod
+    def sample(cls, connection: Connection, size: int = 500) -> Fixtures:
+        order_ids = connection.scalars(select(Order.id).order_by(func.random()).limit(size)).all()
+        template_ids = connection.scalars(
+            select(Sku.id).where(Sku.is_template.is_(True), Sku.is_active.is_(True)).order_by(Sku.id)
+        ).all()
+        phones = connection.scalars(select(Customer.phone).order_by(func.random()).limit(size)).all()
+        return cls(order_ids=list(order_ids), template_ids=list(template_ids), customer_phones=list(phones))
+
+
+@dataclass(frozen=True)
+class BenchRequest:
+    method: str
+    path: str
+    json: dict | None = None
+    data: dict | None = None
+
+
+def _create_order(rng: random.Random, fixtures: Fixtures) -> BenchRequest:
+    # Mostly returning customers, like real intake; the rest take the insert branch of the upsert.
+    phone = rng.choice(fixtures.customer_phones) if rng.random() < 0.7 else f"08{rng.randrange(10**8):08d}"
+    items = [
+        {"sku_id": sku_id, "qty": rng.randint(1, 3), "unit_price": 250000}
+        for sku_id in rng.sample(fixtures.template_ids, rng.randint(1, 2))
+    ]
+    receive_at = datetime.now(timezone.utc) + timedelta(days=1)
+    payload = {
+        "source": "MANUAL",
+        "customer": {"name": "Khách Benchmark", "phone": phone},
+        "receiver": {"name": "Người nhận"},
+        "delivery": {"method": "DELIVERY", "receive_at_iso": receive_at.isoformat(), "address": "12 Lê Lợi"},
+        "items": items,
+        "deposit_amount": 100000,
+    }
+    return BenchRequest("POST", "/orders", payload)
+
+
+def _list_orders(rng: random.Random, fixtures: Fixtures) -> BenchRequest:
+    return BenchRequest("GET", "/orders?limit=20")
+
+
+def _list_orders_page(rng: random.Random, fixtures: Fixtures) -> BenchRequest:
+    # The largest page, so response serialization dominates the query.
+    return BenchRequest("GET", "/orders?limit=100")
+
+
+def _get_order(rng: random.Random, fixtures: Fixtures) -> BenchRequest:
+    return BenchRequest("GET", f"/orders/{rng.choice(fixtures.order_ids)}")
+
+
+def _record_payment(rng: random.Random, fixtures: Fixtures) -> BenchRequest:
+    payload = {"type": "DEPOSIT", "method": "CASH", "amount": 1000, "paid_at": datetime.now(timezone.utc).isoformat()}
+    return BenchRequest("POST", f"/orders/{rng.choice(fixtures.order_ids)}/payments", payload)
+
+
+def _list_customers(rng: random.Random, fixtures: Fixtures) -> BenchRequest:
+    return BenchRequest("GET", f"/customers?limit=20&q={rng.choice(NAME_QUERIES)}")
+
+
+def _list_skus(rng: random.Random, fixtures: Fixtures) -> BenchRequest:
+    return BenchRequest("GET", "/skus?limit=20")
+
+
+def _get_sku_bom(rng: random.Random, fixtures: Fixtures) -> BenchRequest:
+    return BenchRequest("GET", f"/skus/{rng.choice(fixtures.template_ids)}/bom")
+
+
+def _login(rng: random.Random, fixtures: Fixtures) -> BenchRequest:
+    # Dominated by bcrypt in the password hasher's worker processes.
+    return BenchRequest("POST", "/auth/login", data={"username": BENCH_USER, "password": BENCH_PASSWORD})
+
+
+SCENARIOS: dict[str, Callable[[random.Random, Fixtures], BenchRequest]] = {
+    "create_order": _create_order,
+    "list_orders": _list_orders,
+    "list_orders_page": _list_orders_page,
+    "get_order": _get_order,
+    "record_payment": _record_payment,
+    "list_customers": _list_customers,
+    "list_skus": _list_skus,
+    "get_sku_bom": _get_sku_bom,
+    "login": _login,
+}
+# These commit rows, so they run against a throwaway copy of the seeded database.
+WRITE_SCENARIOS = frozenset({"create_order", "record_payment"})
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+# Ensure project root is on sys.path when executing directly
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from app.core.ledger import find_ledger_mismatches  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+
+
+def check(batch_size: int) -> int:
+    mismatches = 0
+    after_id: int | None = 0
+    with SessionLocal() as session:
+        while after_id is not None:
+            batch, after_id = find_ledger_mismatches(session, after_id=after_id, batch_size=batch_size)
+            for row in batch:
+                print(
+                    f"order {row.order_id}: total={row.total_amount} deposit={row.deposit_amount} "
+                    f"paid={row.paid_amount} remaining={row.remaining_amount} "
+                    f"ledger_deposit={row.ledger_deposit} ledger_paid={row.ledger_paid}"
+                )
+            mismatches += len(batch)
+            session.rollback()
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify order payment totals against the payments ledger.")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+    found = check(args.batch_size)
+    print(f"{found} inconsistent orders found.")
+    sys.exit(1 if found else 0)
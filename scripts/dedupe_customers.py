@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+# Ensure project root is on sys.path when executing directly
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from app.core.customer_dedupe import dedupe_customers  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge duplicate customers and normalize phone numbers.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows changed per transaction")
+    parser.add_argument("--name-threshold", type=float, default=0.6, help="Name similarity for shared social links")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the clusters that would be merged")
+    args = parser.parse_args()
+    with SessionLocal() as session:
+        report, clusters = dedupe_customers(
+            session, name_threshold=args.name_threshold, batch_size=args.batch_size, dry_run=args.dry_run
+        )
+    for cluster in clusters:
+        print(f"customer {cluster[0]} <- {', '.join(str(customer_id) for customer_id in cluster[1:])}")
+    print(
+        f"{report.clusters} clusters, {report.merged_customers} customers merged, "
+        f"{report.moved_orders} orders moved, {report.normalized_phones} phones normalized."
+    )
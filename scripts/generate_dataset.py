@@ -0,0 +1,484 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import enum
+import io
+import json
+import random
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+import sys
+
+from sqlalchemy import Connection, Table, create_engine, func, select
+
+# Ensure project root is on sys.path when executing directly
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from app.core import text  # noqa: E402
+from app.core.bom import rebuild_bom_closure  # noqa: E402
+from app.core.config import get_database_url  # noqa: E402
+from app.core.security import pwd_context  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.models.customers import Customer  # noqa: E402
+from app.db.models.orders import (  # noqa: E402
+    Assignment,
+    AssignmentRole,
+    AssignmentStatus,
+    Order,
+    OrderItem,
+    OrderSource,
+    OrderStatus,
+    Payment,
+    PaymentMethod,
+    PaymentType,
+    ReceiveMethod,
+)
+from app.db.models.skus import Sku, SkuAlias, SkuBom  # noqa: E402
+from app.db.models.users import User, UserRole  # noqa: E402
+
+# The dataset's "now": orders are placed before it. A fixed default keeps a seed reproducible whenever it runs.
+DEFAULT_END = datetime(2025, 1, 1, tzinfo=timezone.utc)
+DEFAULT_STATUS_MIX = "NEW=5,CONFIRMING=5,ASSIGNED=5,IN_PROGRESS=5,READY=5,COMPLETED=65,CANCELLED=10"
+
+FAMILY_NAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng", "Bùi", "Đỗ"]
+MIDDLE_NAMES = ["Văn", "Thị", "Hữu", "Đức", "Minh", "Ngọc", "Thanh", "Quốc", "Gia", "Bảo"]
+GIVEN_NAMES = ["An", "Bình", "Châu", "Dung", "Giang", "Hà", "Hải", "Hồng", "Khoa", "Lan", "Linh", "Mai", "Nam"]
+GIVEN_NAMES += ["Ngân", "Phúc", "Quân", "Sơn", "Tâm", "Thảo", "Trang", "Tú", "Uyên", "Vy", "Yến"]
+FLOWERS = ["Hồng", "Cúc", "Lan", "Ly", "Tulip", "Cẩm chướng", "Baby", "Hướng dương", "Mẫu đơn", "Cát tường"]
+COLOURS = ["đỏ", "trắng", "vàng", "hồng phấn", "tím", "cam", "xanh"]
+ORIGINS = ["Đà Lạt", "Ecuador", "Hà Lan", "Kenya", "Trung Quốc"]
+SUPPLIES = [("Giấy gói", "sheet"), ("Ruy băng", "m"), ("Lá phụ", "stem"), ("Xốp cắm hoa", "block")]
+ARRANGEMENTS = ["Bó", "Giỏ", "Hộp", "Lẵng", "Kệ"]
+OCCASIONS = ["sinh nhật", "chúc mừng", "khai trương", "tình yêu", "chia buồn", "tốt nghiệp"]
+ASSIGNMENT_STATUS = {
+    OrderStatus.ASSIGNED: AssignmentStatus.PENDING,
+    OrderStatus.IN_PROGRESS: AssignmentStatus.ACCEPTED,
+    OrderStatus.READY: AssignmentStatus.DONE,
+    OrderStatus.COMPLETED: AssignmentStatus.DONE,
+}
+FINISHED_STATUSES = {OrderStatus.COMPLETED, OrderStatus.CANCELLED}
+BCRYPT_SALT_ALPHABET = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+
+@dataclass
+class DatasetConfig:
+    customers: int = 10_000
+    orders: int = 50_000
+    templates: int = 200
+    components: int = 60
+    users: int = 12
+    max_items: int = 3
+    start: datetime = DEFAULT_END - timedelta(days=365)
+    end: datetime = DEFAULT_END
+    status_mix: dict[OrderStatus, int] = field(default_factory=lambda: parse_status_mix(DEFAULT_STATUS_MIX))
+    seed: int = 1
+    batch_size: int = 5000
+
+
+def parse_status_mix(value: str) -> dict[OrderStatus, int]:
+    mix: dict[OrderStatus, int] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[OrderStatus(name.strip().upper())] = int(weight)
+    if not any(mix.values()):
+        raise ValueError("Status mix needs at least one positive weight")
+    return mix
+
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _copy_value(value: object) -> object:
+    if value is None:
+        return r"\N"
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class BulkWriter:
+    """Streams rows into tables: COPY on PostgreSQL, executemany INSERTs elsewhere."""
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+        self.postgresql = connection.dialect.name == "postgresql"
+        self.counts: dict[str, int] = {}
+
+    def write(self, table: Table, rows: list[dict]) -> None:
+        if not rows:
+            return
+        if self.postgresql:
+            self._copy(table, rows)
+        else:
+            self.connection.execute(table.insert(), rows)
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+    def _copy(self, table: Table, rows: list[dict]) -> None:
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        cursor = self.connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+            )
+        finally:
+            cursor.close()
+
+
+def _next_id(connection: Connection, table: Table) -> int:
+    return (connection.execute(select(func.max(table.c.id))).scalar_one() or 0) + 1
+
+
+def _reset_sequences(connection: Connection, tables: list[Table]) -> None:
+    # Explicit ids bypass the serial sequences, which would otherwise hand them out again.
+    if connection.dialect.name != "postgresql":
+        return
+    for table in tables:
+        connection.exec_driver_sql(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), COALESCE(MAX(id), 1)) FROM {table.name}"
+        )
+
+
+def _batches(rows: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _phone(customer_id: int) -> str:
+    # 7919 is coprime with 10**8, so distinct ids below 10**8 give distinct numbers.
+    return f"09{customer_id * 7919 % 10**8:08d}"
+
+
+def _payment(payment_id: int, order_id: int, type_: PaymentType, amount: int, paid_at: datetime) -> dict:
+    return {
+        "id": payment_id,
+        "order_id": order_id,
+        "type": type_,
+        "method": PaymentMethod.BANK,
+        "amount": amount,
+        "paid_at": paid_at,
+        "recorded_by": None,
+    }
+
+
+def _explode(sku_id: int, boms: dict[int, list[tuple[int, Decimal]]], factor: Decimal = Decimal(1)) -> dict[int, Decimal]:
+    lines: dict[int, Decimal] = {}
+    for component_id, qty in boms.get(sku_id, ()):
+        if component_id in boms:
+            for leaf_id, leaf_qty in _explode(component_id, boms, factor * qty).items():
+                lines[leaf_id] = lines.get(leaf_id, Decimal(0)) + leaf_qty
+        else:
+            lines[component_id] = lines.get(component_id, Decimal(0)) + factor * qty
+    return lines
+
+
+def generate(connection: Connection, config: DatasetConfig) -> dict[str, int]:
+    """Append a synthetic dataset to the database behind ``connection``.
+
+    The output depends only on ``config`` and on the ids already in use, so the
+    same seed against the same starting database gives the same rows.
+    """
+    rng = random.Random(config.seed)
+    writer = BulkWriter(connection)
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("PRAGMA synchronous = OFF")
+
+    user_id = _next_id(connection, User.__table__)
+    # One hash shared by every synthetic user, since bcrypt per row would dominate small runs.
+    # Its salt comes from the seed too, so reruns produce identical user rows.
+    salt = "".join(rng.choice(BCRYPT_SALT_ALPHABET) for _ in range(21)) + "."
+    hashed_password = pwd_context.handler("bcrypt").using(salt=salt).hash(f"synthetic-{config.seed}")
+    roles = [UserRole.SALE, UserRole.FLORIST]
+    users = [
+        {
+            "id": user_id + index,
+            "name": f"synthetic-{roles[index % 2].value.lower()}-{user_id + index}",
+            "phone": None,
+            "role": roles[index % 2],
+            "hashed_password": hashed_password,
+            "is_active": True,
+            "created_at": config.start - timedelta(days=30),
+        }
+        for index in range(max(config.users, 2))
+    ]
+    writer.write(User.__table__, users)
+    sellers = [user["id"] for user in users if user["role"] is UserRole.SALE]
+    florists = [user["id"] for user in users if user["role"] is UserRole.FLORIST]
+
+    sku_id = _next_id(connection, Sku.__table__)
+    created_at = config.start - timedelta(days=30)
+    skus: list[dict] = []
+    for index in range(config.components):
+        if index % 10 == 9:
+            name, unit = SUPPLIES[(index // 10) % len(SUPPLIES)]
+            name = f"{name} {index}"
+        else:
+            name = f"{rng.choice(FLOWERS)} {rng.choice(COLOURS)} {rng.choice(ORIGINS)}"
+            unit = "stem"
+        skus.append(
+            {
+                "id": sku_id + index,
+                "code": f"SYN-C{sku_id + index}",
+                "name": name,
+                "is_template": False,
+                "unit": unit,
+                "track_stock": unit == "stem",
+                "base_price": rng.randrange(5, 60) * 1000,
+                "options_json": {},
+                "is_active": True,
+                "created_at": created_at,
+            }
+        )
+    component_ids = [sku["id"] for sku in skus]
+    templates: list[dict] = []
+    for index in range(config.templates):
+        template_id = sku_id + config.components + index
+        templates.append(
+            {
+                "id": template_id,
+                "code": f"SYN-T{template_id}",
+                "name": f"{rng.choice(ARRANGEMENTS)} {rng.choice(FLOWERS).lower()} {rng.choice(COLOURS)} {rng.choice(OCCASIONS)}",
+                "is_template": True,
+                "unit": "set",
+                "track_stock": False,
+                "base_price": rng.randrange(20, 300) * 10000,
+                "options_json": {},
+                "is_active": rng.random() > 0.05,
+                "created_at": created_at + timedelta(minutes=index),
+            }
+        )
+    writer.write(Sku.__table__, skus + templates)
+
+    # A tenth of the templates nest another template as a sub-assembly, so the BOM has two levels.
+    bom_id = _next_id(connection, SkuBom.__table__)
+    boms: dict[int, list[tuple[int, Decimal]]] = {}
+    bom_rows: list[dict] = []
+    for index, template in enumerate(templates):
+        parts = [(component_id, Decimal(rng.randrange(1, 20))) for component_id in rng.sample(component_ids, rng.randint(2, 5))]
+        if index >= 10 and index % 10 == 0:
+            parts.append((templates[rng.randrange(index)]["id"], Decimal(1)))
+        boms[template["id"]] = parts
+        for component_id, qty in parts:
+            bom_rows.append(
+                {
+                    "id": bom_id + len(bom_rows),
+                    "parent_sku_id": template["id"],
+                    "component_sku_id": component_id,
+                    "qty": qty,
+                    "uom": None,
+                }
+            )
+    writer.write(SkuBom.__table__, bom_rows)
+    rebuild_bom_closure(connection)
+
+    alias_id = _next_id(connection, SkuAlias.__table__)
+    aliases: list[dict] = []
+    for template in templates:
+        words = template["name"].split()
+        for length in range(2, min(len(words), 4) + 1)[: rng.randint(1, 3)]:
+            aliases.append({"id": alias_id + len(aliases), "sku_id": template["id"], "alias": " ".join(words[:length])})
+    writer.write(SkuAlias.__table__, aliases)
+
+    sku_by_id = {sku["id"]: sku for sku in skus + templates}
+    snapshots = {
+        template["id"]: [
+            {
+                "component_sku_id": component_id,
+                "component_code": sku_by_id[component_id]["code"],
+                "component_name": sku_by_id[component_id]["name"],
+                "qty": format(qty.normalize(), "f"),
+                "uom": sku_by_id[component_id]["unit"],
+            }
+            for component_id, qty in sorted(_explode(template["id"], boms).items())
+        ]
+        for template in templates
+    }
+
+    span_seconds = int((config.end - config.start).total_seconds())
+    customer_id = _next_id(connection, Customer.__table__)
+
+    def customer_rows() -> Iterator[dict]:
+        for index in range(config.customers):
+            name = f"{rng.choice(FAMILY_NAMES)} {rng.choice(MIDDLE_NAMES)} {rng.choice(GIVEN_NAMES)}"
+            phone = _phone(customer_id + index)
+            yield {
+                "id": customer_id + index,
+                "name": name,
+                "name_folded": text.fold(name),
+                "phone": phone,
+                "phone_digits": text.phone_digits(phone),
+                "social_link": f"https://zalo.me/{phone}" if rng.random() < 0.3 else None,
+                "notes": None,
+                "created_at": config.start + timedelta(seconds=rng.randrange(span_seconds)),
+                "updated_at": config.start,
+            }
+
+    for batch in _batches(customer_rows(), config.batch_size):
+        writer.write(Customer.__table__, batch)
+
+    statuses = list(config.status_mix)
+    weights = list(config.status_mix.values())
+    order_id = _next_id(connection, Order.__table__)
+    item_id = _next_id(connection, OrderItem.__table__)
+    payment_id = _next_id(connection, Payment.__table__)
+    assignment_id = _next_id(connection, Assignment.__table__)
+    for start in range(0, config.orders, config.batch_size):
+        orders, items, payments, assignments = [], [], [], []
+        for offset in range(start, min(start + config.batch_size, config.orders)):
+            current_id = order_id + offset
+            placed_at = config.start + timedelta(seconds=rng.randrange(span_seconds))
+            status = rng.choices(statuses, weights)[0]
+            receive_at = placed_at + timedelta(hours=rng.randint(2, 72))
+            if status in FINISHED_STATUSES and receive_at > config.end:
+                # Finished orders are history, so they cannot be due after the dataset's "now".
+                receive_at = placed_at + (config.end - placed_at) * rng.random()
+            total = 0
+            for _ in range(rng.randint(1, config.max_items)):
+                template = rng.choice(templates)
+                qty = rng.randint(1, 3)
+                total += template["base_price"] * qty
+                items.append(
+                    {
+                        "id": item_id + len(items),
+                        "order_id": current_id,
+                        "sku_id": template["id"],
+                        "sku_name_snapshot": template["name"],
+                        "qty": Decimal(qty),
+                        "unit_price": template["base_price"],
+                        "line_total": template["base_price"] * qty,
+                        "notes": None,
+                        "options_json": {},
+                        "bom_snapshot": snapshots[template["id"]],
+                    }
+                )
+            deposit = total * rng.choice((0, 0, 3, 5, 10)) // 10
+            paid = deposit
+            if deposit:
+                payments.append(_payment(payment_id + len(payments), current_id, PaymentType.DEPOSIT, deposit, placed_at))
+            if status is OrderStatus.COMPLETED and total > deposit:
+                payments.append(
+                    _payment(payment_id + len(payments), current_id, PaymentType.REMAINING, total - deposit, receive_at)
+                )
+                paid = total
+            elif status is OrderStatus.CANCELLED and deposit and rng.random() < 0.5:
+                payments.append(_payment(payment_id + len(payments), current_id, PaymentType.REFUND, deposit, placed_at))
+                paid = 0
+            if status in ASSIGNMENT_STATUS:
+                assignments.append(
+                    {
+                        "id": assignment_id + len(assignments),
+                        "order_id": current_id,
+                        "assignee_id": rng.choice(florists),
+                        "role": AssignmentRole.FLORIST,
+                        "status": ASSIGNMENT_STATUS[status],
+                        "created_at": placed_at,
+                        "updated_at": placed_at,
+                    }
+                )
+            method = ReceiveMethod.DELIVERY if rng.random() < 0.7 else ReceiveMethod.PICKUP
+            orders.append(
+                {
+                    "id": current_id,
+                    "code": f"SYN{current_id:09d}",
+                    "customer_id": customer_id + rng.randrange(config.customers),
+                    "receiver_name": rng.choice(GIVEN_NAMES),
+                    "receiver_phone": None,
+                    "receive_at": receive_at,
+                    "receive_method": method,
+                    "address": f"{rng.randint(1, 300)} Lê Lợi, Quận {rng.randint(1, 12)}" if method is ReceiveMethod.DELIVERY else None,
+                    "card_message": None,
+                    "status": status,
+                    "source": rng.choice(list(OrderSource)),
+                    "total_amount": total,
+                    "deposit_amount": deposit,
+                    "remaining_amount": max(total - paid, 0),
+                    "paid_amount": paid,
+                    "created_by": rng.choice(sellers),
+                    "created_at": placed_at,
+                    "updated_at": placed_at,
+                }
+            )
+        item_id += len(items)
+        payment_id += len(payments)
+        assignment_id += len(assignments)
+        writer.write(Order.__table__, orders)
+        writer.write(OrderItem.__table__, items)
+        writer.write(Payment.__table__, payments)
+        writer.write(Assignment.__table__, assignments)
+
+    _reset_sequences(
+        connection,
+        [table.__table__ for table in (User, Sku, SkuBom, SkuAlias, Customer, Order, OrderItem, Payment, Assignment)],
+    )
+    return writer.counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append a deterministic synthetic dataset for load and scale testing.")
+    parser.add_argument("--database-url", default=None, help="Defaults to DATABASE_URL")
+    parser.add_argument("--customers", type=int, default=DatasetConfig.customers)
+    parser.add_argument("--orders", type=int, default=DatasetConfig.orders)
+    parser.add_argument("--templates", type=int, default=DatasetConfig.templates, help="Orderable SKUs with BOMs")
+    parser.add_argument("--components", type=int, default=DatasetConfig.components)
+    parser.add_argument("--users", type=int, default=DatasetConfig.users)
+    parser.add_argument("--max-items", type=int, default=DatasetConfig.max_items, help="Line items per order")
+    parser.add_argument(
+        "--start", type=parse_timestamp, default=DatasetConfig.start, help="ISO timestamp of the first order"
+    )
+    parser.add_argument(
+        "--end",
+        type=parse_timestamp,
+        default=DatasetConfig.end,
+        help="ISO timestamp treated as now; only open orders fall due after it",
+    )
+    parser.add_argument("--status-mix", default=DEFAULT_STATUS_MIX, help="Weights, e.g. NEW=5,COMPLETED=80")
+    parser.add_argument("--seed", type=int, default=DatasetConfig.seed)
+    parser.add_argument("--batch-size", type=int, default=DatasetConfig.batch_size)
+    args = parser.parse_args()
+
+    config = DatasetConfig(
+        customers=args.customers,
+        orders=args.orders,
+        templates=args.templates,
+        components=args.components,
+        users=args.users,
+        max_items=args.max_items,
+        start=args.start,
+        end=args.end,
+        status_mix=parse_status_mix(args.status_mix),
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+    engine = create_engine(args.database_url or get_database_url())
+    if engine.dialect.name != "postgresql":
+        # PostgreSQL databases are created by the migrations; elsewhere the models are enough.
+        Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        counts = generate(connection, config)
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+    print(f"Generated in {time.perf_counter() - started:.1f}s.")
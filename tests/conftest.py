@@ -1,41 +1,70 @@
 from __future__ import annotations
 
+import os
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+# Required setting with no fallback; set before the app reads its settings.
+os.environ.setdefault("ORDER_CODE_SECRET", "test-order-code-secret")
 
-from app.core import deps
-from app.db.base import Base
-from app.db.models.users import User, UserRole
-from app.main import app
+from app.core import deps  # noqa: E402
+from app.core.catalog import catalog_cache  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.models.users import User, UserRole  # noqa: E402
+from app.main import app  # noqa: E402
+from tests.query_budget import QueryLog, limit_queries  # noqa: E402
 
 
+# The app runs on an aiosqlite engine while fixtures use a sync engine, so both
+# point at the same file and every test cleans up by deleting all rows.
 @pytest.fixture(scope="session")
-def engine():
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
+def database_path(tmp_path_factory: pytest.TempPathFactory) -> str:
+    return str(tmp_path_factory.mktemp("db") / "test.sqlite3")
+
+
+@pytest.fixture(scope="session")
+def engine(database_path: str):
+    engine = create_engine(f"sqlite:///{database_path}", poolclass=NullPool)
     Base.metadata.create_all(bind=engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="session")
+def async_engine(engine, database_path: str):
+    # NullPool: each TestClient runs its own event loop, so connections must not outlive a request.
+    return create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+
+
+@pytest.fixture()
+def query_budget(async_engine) -> Callable[..., AbstractContextManager[QueryLog]]:
+    """``with query_budget(3): client.get(...)`` fails when the app runs more than three statements."""
+
+    def budget(max_queries: int, allow_duplicates: bool = False) -> AbstractContextManager[QueryLog]:
+        return limit_queries(async_engine, max_queries, allow_duplicates=allow_duplicates)
+
+    return budget
+
+
 @pytest.fixture()
 def db_session(engine) -> Session:
-    connection = engine.connect()
-    transaction = connection.begin()
-    TestingSession = sessionmaker(bind=connection, expire_on_commit=False)
-    session = TestingSession()
+    session = Session(bind=engine, expire_on_commit=False)
     try:
         yield session
     finally:
         session.close()
-        transaction.rollback()
-        connection.close()
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(table.delete())
+        # Deleting the rows resets the catalog version, so a cached catalog could look current.
+        catalog_cache.clear()
 
 
 @pytest.fixture()
@@ -48,7 +77,7 @@ def admin_user(db_session: Session) -> User:
         is_active=True,
     )
     db_session.add(user)
-    db_session.flush()
+    db_session.commit()
     return user
 
 
@@ -62,19 +91,26 @@ def florist_user(db_session: Session) -> User:
         is_active=True,
     )
     db_session.add(user)
-    db_session.flush()
+    db_session.commit()
     return user
 
 
 @pytest.fixture()
-def client(db_session: Session, admin_user: User) -> TestClient:
+def client(db_session: Session, async_engine, admin_user: User) -> TestClient:
+    TestingAsyncSession = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
     def override_get_db():
         yield db_session
 
+    async def override_get_async_db():
+        async with TestingAsyncSession() as session:
+            yield session
+
     def override_get_current_user() -> User:
         return admin_user
 
     app.dependency_overrides[deps.get_db] = override_get_db
+    app.dependency_overrides[deps.get_async_db] = override_get_async_db
     app.dependency_overrides[deps.get_current_active_user] = override_get_current_user
 
     with TestClient(app) as test_client:
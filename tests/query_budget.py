@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass(frozen=True)
+class RecordedQuery:
+    statement: str
+    parameters: tuple
+    executemany: bool
+    seconds: float
+
+
+@dataclass
+class QueryLog:
+    """Statements an engine executed while a ``capture_queries`` block was open."""
+
+    queries: list[RecordedQuery] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    @property
+    def statements(self) -> list[str]:
+        return [query.statement for query in self.queries]
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(query.seconds for query in self.queries)
+
+    def duplicates(self) -> dict[str, int]:
+        # Same SQL with the same parameters: a reload of something the request already had.
+        counts = Counter((query.statement, query.parameters) for query in self.queries if not query.executemany)
+        return {statement: count for (statement, _), count in counts.items() if count > 1}
+
+    def report(self) -> str:
+        lines = [f"{len(self)} queries in {self.total_seconds * 1000:.1f} ms:"]
+        lines += [f"  [{index}] {query.statement} {query.parameters}" for index, query in enumerate(self.queries, 1)]
+        lines += [f"  repeated {count}x: {statement}" for statement, count in self.duplicates().items()]
+        return "\n".join(lines)
+
+
+def _parameters(parameters: object) -> tuple:
+    if isinstance(parameters, dict):
+        return tuple(sorted(parameters.items()))
+    if isinstance(parameters, (list, tuple)):
+        return tuple(parameters)
+    return ()
+
+
+@contextmanager
+def capture_queries(engine: AsyncEngine | Engine) -> Iterator[QueryLog]:
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    log = QueryLog()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        conn.info.setdefault("query_budget_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        started = conn.info["query_budget_started"].pop()
+        log.queries.append(
+            RecordedQuery(statement, _parameters(parameters), executemany, time.perf_counter() - started)
+        )
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield log
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.remove(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+@contextmanager
+def limit_queries(
+    engine: AsyncEngine | Engine, max_queries: int, allow_duplicates: bool = False
+) -> Iterator[QueryLog]:
+    """Fail unless the block runs at most ``max_queries`` statements, none of them repeated.
+
+    The failure message lists every statement, so an N+1 or a reload after
+    commit shows up directly in the test output.
+    """
+    with capture_queries(engine) as log:
+        yield log
+    assert len(log) <= max_queries, f"Query budget of {max_queries} exceeded. {log.report()}"
+    assert allow_duplicates or not log.duplicates(), f"Repeated queries. {log.report()}"
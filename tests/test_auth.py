@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.core import deps, security
+from app.core.auth_cache import user_cache
+from app.db.models.users import User, UserRole
+from app.main import app
+from tests.query_budget import QueryLog, capture_queries
+
+
+def _user_lookups(queries: QueryLog) -> int:
+    return sum("FROM users" in statement for statement in queries.statements)
+
+
+def test_authenticated_user_cache(
+    client: TestClient, db_session: Session, async_engine: AsyncEngine, florist_user: User
+) -> None:
+    user_cache.clear()
+    app.dependency_overrides.pop(deps.get_current_active_user)
+    headers = {"Authorization": f"Bearer {security.create_access_token(florist_user.name, florist_user.role.value)}"}
+
+    try:
+        with capture_queries(async_engine) as queries:
+            assert client.get("/orders", headers=headers).status_code == 200
+            assert client.get("/orders", headers=headers).status_code == 200
+            assert _user_lookups(queries) == 1
+
+            # Florists may not assign orders.
+            assert client.post("/orders/1/assign", json={"assignee_id": 1}, headers=headers).status_code == 403
+
+            florist_user.role = UserRole.BOSS
+            db_session.commit()
+            assert client.post("/orders/1/assign", json={"assignee_id": 1}, headers=headers).status_code == 404
+            assert _user_lookups(queries) == 2
+
+            florist_user.is_active = False
+            db_session.commit()
+            assert client.get("/orders", headers=headers).status_code == 400
+    finally:
+        user_cache.clear()
+
+
+def test_login_rehashes_outdated_password(client: TestClient, db_session: Session) -> None:
+    legacy_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+    user = User(name="sales_test", role=UserRole.SALE, hashed_password=legacy_hash, is_active=True)
+    db_session.add(user)
+    db_session.commit()
+
+    response = client.post("/auth/login", data={"username": "sales_test", "password": "wrong"})
+    assert response.status_code == 400
+
+    response = client.post("/auth/login", data={"username": "sales_test", "password": "secret"})
+    assert response.status_code == 200
+    assert response.json()["role"] == "SALE"
+
+    db_session.refresh(user)
+    assert user.hashed_password != legacy_hash
+    assert not security.pwd_context.needs_update(user.hashed_password)
+    assert security.verify_password("secret", user.hashed_password)
+
+
+def test_password_hasher_holds_slot_until_timed_out_job_finishes() -> None:
+    hasher = security.PasswordHasher(workers=1, max_pending=1, timeout_seconds=0.05)
+
+    async def scenario() -> None:
+        with pytest.raises(HTTPException) as timed_out:
+            await hasher._run(time.sleep, 1)
+        assert timed_out.value.status_code == 503
+        # The sleep still occupies the only worker, so the slot must stay taken.
+        with pytest.raises(HTTPException):
+            await hasher._run(time.sleep, 0)
+        deadline = time.monotonic() + 30
+        while hasher._pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        assert hasher._pending == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+
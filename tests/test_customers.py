@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta, timezone
+
 from fastapi.testclient import TestClient
+from sqlalchemy import Engine, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.customer_dedupe import DedupeReport, dedupe_customers, find_duplicate_clusters
+from app.core.pagination import count_cache
+from app.db.models.customers import Customer
+from app.db.models.orders import Order
 
 
-def test_customer_upsert_by_phone(client: TestClient) -> None:
+def test_customer_upsert_by_phone(client: TestClient, query_budget) -> None:
     payload = {"name": "Alice", "phone": "0123456789", "social_link": "https://zalo.me/alice"}
     response = client.post("/customers/upsert_by_phone", json=payload)
     assert response.status_code == 200
@@ -13,9 +22,156 @@ def test_customer_upsert_by_phone(client: TestClient) -> None:
     customer_id = data["id"]
 
     update_payload = {"name": "Alice Updated", "phone": "0123456789", "social_link": "https://zalo.me/alice2"}
-    response = client.post("/customers/upsert_by_phone", json=update_payload)
+    with query_budget(1) as queries:
+        response = client.post("/customers/upsert_by_phone", json=update_payload)
+    assert "ON CONFLICT (phone) DO UPDATE" in queries.statements[0]
     assert response.status_code == 200
     updated = response.json()
     assert updated["id"] == customer_id
     assert updated["name"] == "Alice Updated"
     assert updated["social_link"] == "https://zalo.me/alice2"
+    assert client.get("/customers", params={"q": "alice updated"}).json()["total"] == 1
+
+
+def test_list_customers_count_modes(client: TestClient, query_budget) -> None:
+    count_cache.clear()
+    for index in range(3):
+        client.post("/customers/upsert_by_phone", json={"name": f"Customer {index}", "phone": f"012345670{index}"})
+
+    with query_budget(2):
+        exact = client.get("/customers", params={"count": "exact"}).json()
+    assert exact["total"] == 3
+    assert exact["total_mode"] == "exact"
+
+    # SQLite has no planner estimate, so the exact count is reported instead.
+    estimated = client.get("/customers", params={"count": "estimated"}).json()
+    assert estimated["total"] == 3
+    assert estimated["total_mode"] == "exact"
+
+    miss = client.get("/customers", params={"count": "cached", "q": "customer"}).json()
+    assert miss["total_mode"] == "exact"
+    with query_budget(1):
+        hit = client.get("/customers", params={"count": "cached", "q": "customer"}).json()
+    assert hit["total"] == 3
+    assert hit["total_mode"] == "cached"
+
+    client.post("/customers/upsert_by_phone", json={"name": "Customer 3", "phone": "0123456703"})
+    refreshed = client.get("/customers", params={"count": "cached", "q": "customer"}).json()
+    assert refreshed["total"] == 4
+    assert refreshed["total_mode"] == "exact"
+
+
+def test_search_customers_by_folded_name_and_phone(
+    client: TestClient, db_session: Session, engine: Engine, query_budget
+) -> None:
+    for name, phone in [("Nguyễn Thị Hồng", "0901234567"), ("Trần Đức", "+84 912 345 678"), ("Hong Lan", "0987654321")]:
+        response = client.post("/customers/upsert_by_phone", json={"name": name, "phone": phone.replace(" ", "")})
+        assert response.status_code == 200
+    db_session.add(Customer(name="Lê Văn Đạt", phone="0933 000 111"))
+    db_session.add(Customer(name="Kiosk 22", phone="0977 111 333"))
+    db_session.commit()
+
+    def names(q: str) -> list[str]:
+        return sorted(customer["name"] for customer in client.get("/customers", params={"q": q}).json()["items"])
+
+    assert names("hồng") == ["Hong Lan", "Nguyễn Thị Hồng"]
+    assert names("DUC") == ["Trần Đức"]
+    assert names("dat") == ["Lê Văn Đạt"]
+    assert names("0901") == ["Nguyễn Thị Hồng"]
+    assert names("0933 000") == ["Lê Văn Đạt"]
+    assert names("+84 912") == ["Trần Đức"]
+    assert names("654") == ["Hong Lan"]
+    assert names("22") == ["Kiosk 22"]
+
+    with query_budget(1):
+        page = client.get("/customers", params={"q": "hong", "limit": 1}).json()
+    assert (page["total"], len(page["items"])) == (2, 1)
+    assert client.get("/customers", params={"q": "hong", "skip": 5}).json()["total"] == 2
+
+    # Prefix phone searches are a range over the phone_digits index rather than a scan.
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id FROM customers WHERE phone_digits >= '0901' AND phone_digits < '0902'"
+        ).all()
+    assert any("ix_customers_phone_digits" in row[3] for row in plan)
+
+
+def test_export_customers_csv(client: TestClient) -> None:
+    client.post("/customers/upsert_by_phone", json={"name": "Alice", "phone": "0123456789"})
+    client.post("/customers/upsert_by_phone", json={"name": "Bob", "phone": "0987654321"})
+
+    response = client.get("/export/customers", params={"q": "ali"})
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0].startswith("id,name,phone")
+    assert len(lines) == 2
+    assert ",Alice,0123456789," in lines[1]
+
+
+def test_get_customer_conditional_requests(client: TestClient, db_session: Session, query_budget) -> None:
+    customer_id = client.post("/customers/upsert_by_phone", json={"name": "Alice", "phone": "0123456789"}).json()["id"]
+
+    with query_budget(1):
+        response = client.get(f"/customers/{customer_id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    with query_budget(1):
+        assert client.get(f"/customers/{customer_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/customers/{customer_id}", headers={"If-None-Match": '"other", ' + etag}).status_code == 304
+
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    db_session.execute(update(Customer).where(Customer.id == customer_id).values(updated_at=later))
+    db_session.commit()
+    changed = client.get(f"/customers/{customer_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["name"] == "Alice"
+
+
+def test_dedupe_customers_merges_and_normalizes(client: TestClient, db_session: Session) -> None:
+    receive_at = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+
+    def order_for(name: str, phone: str) -> int:
+        payload = {
+            "source": "MANUAL",
+            "customer": {"name": name, "phone": phone},
+            "receiver": {"name": "Receiver", "phone": "0977777777"},
+            "delivery": {"method": "PICKUP", "receive_at_iso": receive_at},
+        }
+        response = client.post("/orders", json=payload)
+        assert response.status_code == 200
+        return response.json()["customer"]["id"]
+
+    hong = order_for("Nguyễn Hồng", "0912345678")
+    order_for("Nguyễn Hồng", "0912345678")
+    hong_intl = order_for("Hong Nguyen", "+84912345678")
+    an = Customer(name="Trần Văn An", phone="0933000111", social_link="https://zalo.me/an.tran")
+    an_second_phone = Customer(name="Tran Van An", phone="0944000222", social_link="zalo.me/An.Tran/", notes="VIP")
+    shared_link = Customer(name="Lê Thị Bích", phone="0955000333", social_link="zalo.me/an.tran")
+    lone = Customer(name="Khách lẻ", phone="+84977123456")
+    db_session.add_all([an, an_second_phone, shared_link, lone])
+    db_session.commit()
+
+    preview, clusters = dedupe_customers(db_session, dry_run=True)
+    assert clusters == [[hong, hong_intl], [an.id, an_second_phone.id]]
+    assert preview.merged_customers == 0
+
+    report, _ = dedupe_customers(db_session, batch_size=1)
+    assert report == DedupeReport(clusters=2, merged_customers=2, moved_orders=1, normalized_phones=1)
+    customers = {row.id: row for row in db_session.scalars(select(Customer)).all()}
+    assert sorted(customers) == sorted([hong, an.id, shared_link.id, lone.id])
+    assert customers[an.id].notes == "VIP"
+    assert customers[lone.id].phone == "0977123456"
+    assert db_session.scalar(select(func.count()).where(Order.customer_id == hong)) == 3
+    assert dedupe_customers(db_session)[0].clusters == 0
+
+
+def test_dedupe_ignores_links_shared_by_many_customers(db_session: Session) -> None:
+    db_session.add_all(
+        Customer(name="Nguyễn Thị Mai", phone=f"09110000{index:02d}", social_link="https://facebook.com/hoa-shop")
+        for index in range(3)
+    )
+    db_session.commit()
+
+    assert len(find_duplicate_clusters(db_session)[0]) == 3
+    assert find_duplicate_clusters(db_session, max_link_group=2) == []
@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+import csv
+import io
+import json
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
-from app.db.models.orders import OrderStatus
+from app.core.ledger import find_ledger_mismatches
+from app.core import order_codes
+from app.core.order_codes import decode_order_code, encode_order_code
+from app.db.models.customers import Customer
+from app.db.models.orders import Order, OrderSource, OrderStatus, ReceiveMethod
 from app.db.models.skus import Sku, SkuBom
+from app.db.models.users import User
+from app.routers import orders as orders_router
 
 
 @pytest.fixture()
@@ -43,10 +54,34 @@ def template_sku(db_session: Session) -> Sku:
             uom="stem",
         )
     )
-    db_session.flush()
+    db_session.commit()
     return template
 
 
+def _make_templates(db_session: Session, component: Sku, count: int) -> list[Sku]:
+    templates = [
+        Sku(
+            code=f"BQT-{index}",
+            name=f"Bouquet {index}",
+            is_template=True,
+            unit="bunch",
+            track_stock=True,
+            base_price=150000,
+            options_json={},
+            is_active=True,
+        )
+        for index in range(count)
+    ]
+    db_session.add_all(templates)
+    db_session.flush()
+    db_session.add_all(
+        SkuBom(parent_sku_id=template.id, component_sku_id=component.id, qty=Decimal("5"), uom="stem")
+        for template in templates
+    )
+    db_session.commit()
+    return templates
+
+
 def _order_payload(sku: Sku, receive_at: datetime, include_items: bool = True) -> dict:
     payload = {
         "source": "MANUAL",
@@ -72,9 +107,11 @@ def _order_payload(sku: Sku, receive_at: datetime, include_items: bool = True) -
     return payload
 
 
-def test_create_order_with_items(client: TestClient, template_sku: Sku) -> None:
+def test_create_order_with_items(client: TestClient, query_budget, template_sku: Sku) -> None:
     receive_at = datetime.now(timezone.utc) + timedelta(hours=2)
-    response = client.post("/orders", json=_order_payload(template_sku, receive_at))
+    # Includes the cold catalog load (5) and creating the order code counter (1).
+    with query_budget(15):
+        response = client.post("/orders", json=_order_payload(template_sku, receive_at))
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == OrderStatus.NEW.value
@@ -101,7 +138,7 @@ def test_create_order_without_items(client: TestClient, template_sku: Sku) -> No
     assert data["remaining_amount"] == 0
 
 
-def test_order_status_transitions(client: TestClient, template_sku: Sku) -> None:
+def test_order_status_transitions(client: TestClient, query_budget, template_sku: Sku) -> None:
     receive_at = datetime.now(timezone.utc) + timedelta(hours=1)
     response = client.post("/orders", json=_order_payload(template_sku, receive_at))
     order = response.json()
@@ -113,7 +150,8 @@ def test_order_status_transitions(client: TestClient, template_sku: Sku) -> None
         OrderStatus.READY.value,
         OrderStatus.COMPLETED.value,
     ]:
-        transition = client.post(f"/orders/{order_id}/status", json={"status": target})
+        with query_budget(7):
+            transition = client.post(f"/orders/{order_id}/status", json={"status": target})
         assert transition.status_code == 200
         assert transition.json()["status"] == target
 
@@ -132,3 +170,423 @@ def test_invalid_status_transition(client: TestClient, template_sku: Sku) -> Non
     cancel = client.post(f"/orders/{order_id}/status", json={"status": OrderStatus.CANCELLED.value})
     assert cancel.status_code == 200
     assert cancel.json()["status"] == OrderStatus.CANCELLED.value
+
+
+def test_create_order_query_count_is_flat(
+    client: TestClient, db_session: Session, query_budget, template_sku: Sku
+) -> None:
+    component = template_sku.bom_components[0].component
+    templates = _make_templates(db_session, component, 10)
+    receive_at = datetime.now(timezone.utc) + timedelta(hours=2)
+
+    def payload_for(skus: list[Sku]) -> dict:
+        payload = _order_payload(template_sku, receive_at)
+        payload["items"] = [{"sku_id": sku.id, "qty": 1, "unit_price": 100000} for sku in skus]
+        return payload
+
+    # Warm up so both measured requests hit an existing customer row. Its details do not
+    # change, so the upsert skips the update and the customer is read back separately.
+    assert client.post("/orders", json=payload_for(templates[:1])).status_code == 200
+
+    with query_budget(11) as single_line:
+        response = client.post("/orders", json=payload_for(templates[:1]))
+    assert response.status_code == 200
+
+    with query_budget(11) as many_lines:
+        response = client.post("/orders", json=payload_for(templates))
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 10
+    assert all(item["bom_snapshot"][0]["component_code"] == "STEM" for item in data["items"])
+
+    assert len(many_lines) == len(single_line)
+
+
+def test_list_orders_cursor_pagination(client: TestClient, db_session: Session, query_budget) -> None:
+    customer = Customer(name="Carol", phone="0911111111")
+    db_session.add(customer)
+    db_session.flush()
+    base = datetime(2024, 2, 14, 8, 0, tzinfo=timezone.utc)
+    orders = [
+        Order(
+            code=f"CUR{index:03d}",
+            customer_id=customer.id,
+            receiver_name="Receiver",
+            status=OrderStatus.CANCELLED if index % 3 == 0 else OrderStatus.NEW,
+            source=OrderSource.MANUAL,
+            # Pairs of orders share a timestamp so the id tie-breaker is exercised.
+            created_at=base + timedelta(minutes=index // 2),
+        )
+        for index in range(7)
+    ]
+    db_session.add_all(orders)
+    db_session.commit()
+    expected = [order.id for order in sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)]
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        with query_budget(5):
+            response = client.get("/orders", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert page["total"] is None
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+    first = client.get("/orders", params={"status": "NEW", "limit": 3}).json()
+    assert first["total"] == 4
+    second = client.get("/orders", params={"status": "NEW", "limit": 3, "cursor": first["next_cursor"]}).json()
+    assert second["next_cursor"] is None
+    new_ids = [order_id for order_id in expected if db_session.get(Order, order_id).status == OrderStatus.NEW]
+    assert [item["id"] for item in first["items"] + second["items"]] == new_ids
+
+    assert client.get("/orders", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_list_orders_summary_view(client: TestClient, query_budget, template_sku: Sku) -> None:
+    receive_at = datetime.now(timezone.utc) + timedelta(hours=4)
+    for _ in range(3):
+        assert client.post("/orders", json=_order_payload(template_sku, receive_at)).status_code == 200
+
+    with query_budget(1) as queries:
+        response = client.get("/orders", params={"view": "summary", "include_total": "false"})
+    assert response.status_code == 200
+    assert "bom_snapshot" not in queries.statements[0]
+    items = response.json()["items"]
+    assert len(items) == 3
+    assert set(items[0]) == {"id", "code", "status", "receiver_name", "receive_method", "receive_at", "created_at"}
+
+    response = client.get("/orders", params={"view": "summary", "fields": "total_amount,address"})
+    item = response.json()["items"][0]
+    assert item["total_amount"] == 400000
+    assert item["address"] == "123 Flower Street"
+    assert "card_message" not in item
+
+    assert client.get("/orders", params={"view": "summary", "fields": "items"}).status_code == 400
+
+
+def test_bulk_create_orders_json_modes(client: TestClient, db_session: Session, template_sku: Sku) -> None:
+    receive_at = datetime.now(timezone.utc) + timedelta(days=1)
+    good = _order_payload(template_sku, receive_at)
+    repeat = _order_payload(template_sku, receive_at)
+    repeat["customer"]["name"] = "Bob Renamed"
+    unknown_sku = _order_payload(template_sku, receive_at)
+    unknown_sku["items"][0]["sku_id"] = 999999
+    bad_phone = _order_payload(template_sku, receive_at)
+    bad_phone["customer"]["phone"] = "abc"
+
+    atomic = client.post("/orders/bulk", json=[good, unknown_sku])
+    assert atomic.status_code == 422
+    assert atomic.json()["detail"]["results"][1]["errors"] == ["SKU 999999 not found"]
+    assert client.get("/orders").json()["total"] == 0
+
+    response = client.post("/orders/bulk", params={"mode": "best_effort"}, json=[good, unknown_sku, bad_phone, repeat])
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (2, 2)
+    assert [row["ok"] for row in data["results"]] == [True, False, False, True]
+    assert data["results"][2]["errors"][0].startswith("customer.phone")
+
+    orders = client.get("/orders").json()
+    assert orders["total"] == 2
+    assert {order["code"] for order in orders["items"]} == {data["results"][0]["code"], data["results"][3]["code"]}
+    assert all(order["customer"]["name"] == "Bob Renamed" for order in orders["items"])
+    assert all(order["items"][0]["bom_snapshot"] for order in orders["items"])
+
+
+def test_bulk_create_orders_ndjson_and_csv(client: TestClient, template_sku: Sku) -> None:
+    receive_at = datetime.now(timezone.utc) + timedelta(days=1)
+    ndjson = "\n".join([json.dumps(_order_payload(template_sku, receive_at)), "{not json", ""])
+    response = client.post(
+        "/orders/bulk",
+        params={"mode": "best_effort"},
+        content=ndjson,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert [row["ok"] for row in response.json()["results"]] == [True, False]
+
+    header = "ref,source,customer_name,customer_phone,receiver_name,delivery_method,receive_at,address,sku_id,qty,unit_price"
+    rows = [
+        f"A,ZALO,Dana,0933333333,Dana,DELIVERY,{receive_at.isoformat()},1 Rose St,{template_sku.id},1,100000",
+        f"A,ZALO,Dana,0933333333,Dana,DELIVERY,{receive_at.isoformat()},1 Rose St,{template_sku.id},2,50000",
+        "B,FORM,Eve,0944444444,Eve,,,,,,",
+    ]
+    response = client.post("/orders/bulk", content="\n".join([header, *rows]), headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [row["ok"] for row in results] == [True, True]
+
+    detail = client.get(f"/orders/{results[0]['order_id']}").json()
+    assert detail["total_amount"] == 200000
+    assert len(detail["items"]) == 2
+    assert client.get(f"/orders/{results[1]['order_id']}").json()["status"] == OrderStatus.CONFIRMING.value
+
+
+def test_bulk_create_orders_rejects_oversized_bodies(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, template_sku: Sku
+) -> None:
+    receive_at = datetime.now(timezone.utc) + timedelta(days=1)
+    body = json.dumps([_order_payload(template_sku, receive_at)])
+    monkeypatch.setattr(orders_router, "BULK_MAX_BYTES", len(body) - 1)
+    response = client.post("/orders/bulk", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
+
+    # Without a Content-Length the body is cut off while it streams in.
+    chunked = client.post(
+        "/orders/bulk",
+        content=iter([body[:10].encode(), body[10:].encode()]),
+        headers={"Content-Type": "application/json"},
+    )
+    assert chunked.status_code == 413
+
+    monkeypatch.setattr(orders_router, "BULK_MAX_BYTES", 1024 * 1024)
+    monkeypatch.setattr(orders_router, "BULK_MAX_ROWS", 1)
+    csv_body = "\n".join(
+        ["ref,source,customer_name,customer_phone,receiver_name", "A,ZALO,Dana,0933333333,Dana", "B,FORM,Eve,0944444444,Eve"]
+    )
+    response = client.post("/orders/bulk", content=csv_body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 413
+    assert response.json()["detail"] == "At most 1 orders per request"
+
+
+def test_order_codes_are_unique_permutations(client: TestClient, template_sku: Sku) -> None:
+    key = b"test-key"
+    codes = {encode_order_code(value, key) for value in range(20000)}
+    assert len(codes) == 20000
+    assert all(len(code) == 7 for code in codes)
+    assert all(decode_order_code(encode_order_code(value, key), key) == value for value in (0, 1, 12345, 2**34 - 1))
+
+    receive_at = datetime.now(timezone.utc) + timedelta(hours=2)
+    first = client.post("/orders", json=_order_payload(template_sku, receive_at)).json()["code"]
+    second = client.post("/orders", json=_order_payload(template_sku, receive_at)).json()["code"]
+    assert first != second
+    assert decode_order_code(second) == decode_order_code(first) + 1
+
+
+def test_order_codes_survive_jwt_secret_rotation(monkeypatch: pytest.MonkeyPatch) -> None:
+    settings = order_codes.get_settings()
+    before = [encode_order_code(value) for value in (1, 2, 500)]
+
+    rotated = settings.model_copy(update={"jwt_secret": "rotated-jwt-secret"})
+    monkeypatch.setattr(order_codes, "get_settings", lambda: rotated)
+    assert [encode_order_code(value) for value in (1, 2, 500)] == before
+    assert decode_order_code(before[2]) == 500
+
+
+def test_record_payment_updates_totals_incrementally(
+    client: TestClient, db_session: Session, query_budget, template_sku: Sku
+) -> None:
+    receive_at = datetime.now(timezone.utc) + timedelta(hours=2)
+    payload = _order_payload(template_sku, receive_at)
+    payload["deposit_amount"] = 50000
+    order = client.post("/orders", json=payload).json()
+    paid_at = datetime.now(timezone.utc).isoformat()
+
+    def pay(kind: str, amount: int) -> None:
+        response = client.post(
+            f"/orders/{order['id']}/payments",
+            json={"type": kind, "method": "CASH", "amount": amount, "paid_at": paid_at},
+        )
+        assert response.status_code == 200
+
+    with query_budget(2) as queries:
+        pay("DEPOSIT", 100000)
+    assert not any("FROM payments" in statement for statement in queries.statements)
+
+    pay("REMAINING", 300000)
+    stored = client.get(f"/orders/{order['id']}").json()
+    assert (stored["deposit_amount"], stored["remaining_amount"]) == (150000, 0)
+
+    pay("REFUND", 80000)
+    stored = client.get(f"/orders/{order['id']}").json()
+    assert (stored["deposit_amount"], stored["remaining_amount"]) == (150000, 30000)
+
+    assert find_ledger_mismatches(db_session) == ([], order["id"])
+    db_session.execute(update(Order).where(Order.id == order["id"]).values(remaining_amount=1))
+    mismatches, _ = find_ledger_mismatches(db_session)
+    assert [row.order_id for row in mismatches] == [order["id"]]
+    db_session.rollback()
+
+    missing = client.post(
+        "/orders/999999/payments", json={"type": "DEPOSIT", "method": "CASH", "amount": 1, "paid_at": paid_at}
+    )
+    assert missing.status_code == 404
+
+
+def test_export_orders_streams_csv_and_ndjson(client: TestClient, template_sku: Sku) -> None:
+    receive_at = datetime.now(timezone.utc) + timedelta(hours=2)
+    codes = [client.post("/orders", json=_order_payload(template_sku, receive_at)).json()["code"] for _ in range(3)]
+    client.post("/orders", json=_order_payload(template_sku, receive_at, include_items=False))
+
+    response = client.get("/export/orders", params={"status": "NEW"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["code"] for row in rows] == codes
+    assert rows[0]["customer_phone"] == "0987654321"
+    assert rows[0]["total_amount"] == "400000"
+
+    response = client.get("/export/orders", params={"format": "ndjson", "phone": "0987"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 4
+    assert lines[0]["status"] == "NEW"
+
+    payments = client.get("/export/payments", params={"format": "ndjson"})
+    assert payments.status_code == 200
+    assert payments.text == ""
+
+
+def test_get_order_conditional_requests(
+    client: TestClient, db_session: Session, query_budget, florist_user: User, template_sku: Sku
+) -> None:
+    receive_at = datetime.now(timezone.utc) + timedelta(hours=2)
+    order_id = client.post("/orders", json=_order_payload(template_sku, receive_at)).json()["id"]
+
+    with query_budget(6):
+        response = client.get(f"/orders/{order_id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    last_modified = response.headers["last-modified"]
+
+    with query_budget(1):
+        cached = client.get(f"/orders/{order_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert client.get(f"/orders/{order_id}", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    # Another order from the same customer with the same details leaves this one's version alone.
+    db_session.execute(update(Customer).values(updated_at=datetime(2024, 1, 1, tzinfo=timezone.utc)))
+    db_session.commit()
+    etag = client.get(f"/orders/{order_id}").headers["etag"]
+    assert client.post("/orders", json=_order_payload(template_sku, receive_at)).status_code == 200
+    assert client.get(f"/orders/{order_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    with query_budget(5):
+        assert client.post(f"/orders/{order_id}/assign", json={"assignee_id": florist_user.id}).status_code == 200
+    changed = client.get(f"/orders/{order_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()["assignments"]) == 1
+
+    assert client.get("/orders/999999", headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_order_schedule_buckets(client: TestClient, db_session: Session) -> None:
+    customer = Customer(name="Dan", phone="0922222222")
+    db_session.add(customer)
+    db_session.flush()
+    # Window starts at local midnight in UTC+7.
+    start = datetime(2024, 2, 13, 17, 0, tzinfo=timezone.utc)
+    slots = [
+        (timedelta(minutes=10), ReceiveMethod.DELIVERY, OrderStatus.NEW),
+        (timedelta(minutes=50), ReceiveMethod.PICKUP, OrderStatus.READY),
+        (timedelta(minutes=55), ReceiveMethod.DELIVERY, OrderStatus.CANCELLED),
+        (timedelta(hours=2, minutes=5), ReceiveMethod.DELIVERY, OrderStatus.ASSIGNED),
+        (timedelta(hours=2, minutes=30), ReceiveMethod.DELIVERY, OrderStatus.NEW),
+        (timedelta(hours=5), ReceiveMethod.PICKUP, OrderStatus.NEW),
+    ]
+    db_session.add_all(
+        Order(
+            code=f"SCH{index:03d}",
+            customer_id=customer.id,
+            receiver_name=f"Receiver {index}",
+            receive_method=method,
+            receive_at=start + offset,
+            address="1 Le Loi",
+            status=order_status,
+            source=OrderSource.MANUAL,
+        )
+        for index, (offset, method, order_status) in enumerate(slots)
+    )
+    db_session.commit()
+
+    params = {"from": start.isoformat(), "to": (start + timedelta(hours=4)).isoformat(), "bucket": "1h"}
+    response = client.get("/orders/schedule", params=params)
+    assert response.status_code == 200
+    schedule = response.json()
+    assert schedule["bucket_seconds"] == 3600
+    assert schedule["total"] == 4
+    assert [bucket["total"] for bucket in schedule["buckets"]] == [2, 0, 2, 0]
+    first = schedule["buckets"][0]
+    assert first["by_method"] == {"DELIVERY": 1, "PICKUP": 1}
+    assert [order["receiver_name"] for order in first["orders"]] == ["Receiver 0", "Receiver 1"]
+    assert first["orders"][0]["address"] == "1 Le Loi"
+    assert "total_amount" not in first["orders"][0]
+
+    limited = client.get(
+        "/orders/schedule",
+        params={**params, "bucket": "2h", "per_bucket": 1, "include_cancelled": "true", "receive_method": "DELIVERY"},
+    ).json()
+    assert [bucket["total"] for bucket in limited["buckets"]] == [2, 2]
+    assert [len(bucket["orders"]) for bucket in limited["buckets"]] == [1, 1]
+
+    # A fractional 'to' still gets a bucket for an order in its last partial second.
+    fractional = {**params, "to": (start + timedelta(hours=5, milliseconds=500)).isoformat()}
+    response = client.get("/orders/schedule", params=fractional)
+    assert response.status_code == 200
+    assert [bucket["total"] for bucket in response.json()["buckets"]] == [2, 0, 2, 0, 0, 1]
+
+    assert client.get("/orders/schedule", params={**params, "bucket": "1w"}).status_code == 400
+    assert client.get("/orders/schedule", params={**params, "to": params["from"]}).status_code == 400
+
+
+def test_order_schedule_summaries_use_lateral_on_postgresql() -> None:
+    start = datetime(2024, 2, 13, 17, 0, tzinfo=timezone.utc)
+    statement = orders_router._schedule_summaries(
+        "postgresql", [(0, start, start + timedelta(hours=1))], [Order.receive_at >= start], 5
+    )
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "JOIN LATERAL" in sql
+    assert " IN (" not in sql
+
+
+def test_component_demand_explodes_open_order_boms(
+    client: TestClient, db_session: Session, template_sku: Sku
+) -> None:
+    component = template_sku.bom_components[0].component
+    ribbon = Sku(code="RIBBON", name="Ribbon", unit="m", track_stock=False, base_price=5000, is_active=True)
+    db_session.add(ribbon)
+    db_session.flush()
+    db_session.add(SkuBom(parent_sku_id=template_sku.id, component_sku_id=ribbon.id, qty=Decimal("1.5"), uom="m"))
+    db_session.commit()
+
+    receive_at = datetime.now(timezone.utc) + timedelta(days=1)
+    order_ids = []
+    for qty, offset in [(2, timedelta(hours=0)), (1, timedelta(hours=3)), (4, timedelta(days=5))]:
+        payload = _order_payload(template_sku, receive_at + offset)
+        payload["items"][0]["qty"] = qty
+        order_ids.append(client.post("/orders", json=payload).json()["id"])
+    without_items = _order_payload(template_sku, receive_at, include_items=False)
+    assert client.post("/orders", json=without_items).status_code == 200
+    db_session.execute(update(Order).where(Order.id == order_ids[1]).values(status=OrderStatus.CANCELLED))
+    db_session.commit()
+
+    params = {"from": (receive_at - timedelta(hours=1)).isoformat(), "to": (receive_at + timedelta(days=1)).isoformat()}
+    response = client.get("/orders/component-demand", params=params)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["order_count"] == 2
+    assert report["components"] == [
+        {
+            "component_sku_id": component.id,
+            "code": "STEM",
+            "name": "Flower Stem",
+            "unit": "stem",
+            "track_stock": True,
+            "qty": "6.000",
+            "order_count": 1,
+        }
+    ]
+
+    everything = client.get("/orders/component-demand", params={**params, "tracked_only": "false"}).json()
+    assert {row["code"]: row["qty"] for row in everything["components"]} == {"STEM": "6.000", "RIBBON": "3.000"}
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.core.bom import rebuild_bom_closure
+from app.db.models.customers import Customer
+from app.db.models.orders import (
+    Assignment,
+    AssignmentRole,
+    AssignmentStatus,
+    Order,
+    OrderItem,
+    OrderSource,
+    OrderStatus,
+    Payment,
+    PaymentMethod,
+    PaymentType,
+    ReceiveMethod,
+)
+from app.db.models.skus import Sku, SkuBom
+from app.db.models.users import User
+
+# Tables that grow with the business; the catalog tables stay small enough to scan.
+LARGE_TABLES = {"orders", "order_items", "payments", "assignments", "customers", "sku_bom", "sku_bom_closure"}
+CUSTOMERS = 1000
+ORDERS = 4000
+START = datetime(2024, 10, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def dataset(db_session: Session, engine: Engine, admin_user: User) -> dict[str, int]:
+    components = [
+        Sku(code=f"STEM-{index}", name=f"Stem {index}", base_price=10000, is_template=False) for index in range(20)
+    ]
+    templates = [
+        Sku(code=f"BQT-{index}", name=f"Bouquet {index}", base_price=300000, is_template=True) for index in range(40)
+    ]
+    db_session.add_all([*components, *templates])
+    db_session.flush()
+    db_session.execute(
+        insert(SkuBom),
+        [
+            {
+                "parent_sku_id": template.id,
+                "component_sku_id": components[(index + offset) % len(components)].id,
+                "qty": Decimal(5 + offset),
+                "uom": "stem",
+            }
+            for index, template in enumerate(templates)
+            for offset in range(3)
+        ],
+    )
+    rebuild_bom_closure(db_session.connection())
+    db_session.execute(
+        insert(Customer),
+        [
+            {"name": f"Customer {index}", "phone": f"09{index:08d}", "created_at": START + timedelta(minutes=index)}
+            for index in range(CUSTOMERS)
+        ],
+    )
+    customer_ids = db_session.scalars(Customer.__table__.select().with_only_columns(Customer.id)).all()
+    statuses = list(OrderStatus)
+    db_session.execute(
+        insert(Order),
+        [
+            {
+                "code": f"SEED{index:06d}",
+                "customer_id": customer_ids[index % len(customer_ids)],
+                "receiver_name": "Receiver",
+                "receive_method": ReceiveMethod.DELIVERY if index % 3 else ReceiveMethod.PICKUP,
+                "receive_at": START + timedelta(hours=index // 10),
+                "status": statuses[index % len(statuses)],
+                "source": OrderSource.MANUAL,
+                "total_amount": 300000,
+                "deposit_amount": 100000,
+                "paid_amount": 100000,
+                "remaining_amount": 200000,
+                "created_by": admin_user.id,
+                "created_at": START + timedelta(minutes=index),
+                "updated_at": START + timedelta(minutes=index),
+            }
+            for index in range(ORDERS)
+        ],
+    )
+    order_ids = db_session.scalars(Order.__table__.select().with_only_columns(Order.id)).all()
+    db_session.execute(
+        insert(OrderItem),
+        [
+            {
+                "order_id": order_id,
+                "sku_id": templates[(index + line) % len(templates)].id,
+                "sku_name_snapshot": "Bouquet",
+                "bom_snapshot": [{"component_sku_id": components[line].id, "qty": "5", "uom": "stem"}],
+                "qty": Decimal(1),
+                "unit_price": 150000,
+                "line_total": 150000,
+            }
+            for index, order_id in enumerate(order_ids)
+            for line in range(2)
+        ],
+    )
+    db_session.execute(
+        insert(Payment),
+        [
+            {
+                "order_id": order_id,
+                "type": PaymentType.DEPOSIT,
+                "method": PaymentMethod.BANK,
+                "amount": 100000,
+                "paid_at": START,
+            }
+            for order_id in order_ids
+        ],
+    )
+    db_session.execute(
+        insert(Assignment),
+        [
+            {
+                "order_id": order_id,
+                "assignee_id": admin_user.id,
+                "role": AssignmentRole.FLORIST,
+                "status": AssignmentStatus.PENDING,
+            }
+            for order_id in order_ids[::2]
+        ],
+    )
+    db_session.commit()
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    return {
+        "order_id": order_ids[len(order_ids) // 2],
+        "customer_id": customer_ids[0],
+        "sku_id": templates[0].id,
+        "component_sku_id": components[5].id,
+    }
+
+
+@contextmanager
+def _capture_statements(async_engine: AsyncEngine) -> Iterator[list[tuple[str, tuple]]]:
+    engine = async_engine.sync_engine
+    statements: list[tuple[str, tuple]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        # Plain inserts have no plan worth checking; everything that reads or filters does.
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+            statements.append((statement, tuple(parameters or ())))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _plan_problems(engine: Engine, statement: str, parameters: tuple) -> list[str]:
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    problems = []
+    for _, _, _, detail in plan:
+        # SQLite reports aliased tables by alias, e.g. orders_1.
+        scan = re.match(r"SCAN (\w+?)(?:_\d+)?\b", detail)
+        if scan and scan.group(1) in LARGE_TABLES and "INDEX" not in detail:
+            problems.append(detail)
+        if detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+            problems.append(detail)
+    return problems
+
+
+def test_hot_queries_use_indexes(
+    client: TestClient, engine: Engine, async_engine: AsyncEngine, dataset: dict[str, int]
+) -> None:
+    day = START + timedelta(days=1)
+    requests = [
+        ("GET", "/orders", {}),
+        ("GET", "/orders", {"status": OrderStatus.NEW.value}),
+        ("GET", "/orders", {"view": "summary", "status": OrderStatus.READY.value, "count": "exact"}),
+        ("GET", "/orders", {"date_from": day.isoformat(), "date_to": (day + timedelta(hours=6)).isoformat()}),
+        ("GET", "/orders/schedule", {"from": day.isoformat(), "to": (day + timedelta(days=1)).isoformat()}),
+        ("GET", "/orders/component-demand", {"from": day.isoformat(), "to": (day + timedelta(days=3)).isoformat()}),
+        ("GET", f"/orders/{dataset['order_id']}", {}),
+        ("GET", "/customers", {}),
+        ("GET", f"/customers/{dataset['customer_id']}", {}),
+        ("GET", f"/skus/{dataset['sku_id']}/bom", {}),
+        ("GET", f"/skus/{dataset['sku_id']}/bom/exploded", {}),
+    ]
+
+    failures = []
+    # Loading the catalog reads it whole, once per catalog version; requests after that only check the version.
+    assert client.get("/skus").status_code == 200
+    with _capture_statements(async_engine) as statements:
+        for method, path, params in requests:
+            captured = len(statements)
+            response = client.request(method, path, params=params)
+            assert response.status_code == 200, (path, response.text)
+            assert len(statements) > captured, f"{path} {params} ran no captured statement"
+        next_cursor = client.get("/orders", params={"status": OrderStatus.NEW.value}).json()["next_cursor"]
+        assert client.get("/orders", params={"status": OrderStatus.NEW.value, "cursor": next_cursor}).status_code == 200
+        payment = {"type": "REMAINING", "method": "CASH", "amount": 50000, "paid_at": day.isoformat()}
+        assert client.post(f"/orders/{dataset['order_id']}/payments", json=payment).status_code == 200
+        component = {"component_sku_id": dataset["component_sku_id"], "qty": "2"}
+        assert client.put(f"/skus/{dataset['sku_id']}/bom", json=component).status_code == 200
+
+    assert statements
+    for statement, parameters in statements:
+        problems = _plan_problems(engine, statement, parameters)
+        if problems:
+            failures.append(f"{statement}\n  -> {'; '.join(problems)}")
+    assert not failures, "Queries without a usable index:\n" + "\n".join(failures)
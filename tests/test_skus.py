@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, event, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.core.bom import BomCycleError, rebuild_bom_closure
+from app.db.models.skus import Sku, SkuBom, SkuBomClosure
+
+
+def _sku(db_session: Session, code: str, *, unit: str | None = None, is_template: bool = False) -> Sku:
+    sku = Sku(code=code, name=code.title(), unit=unit, is_template=is_template, base_price=10000, is_active=True)
+    db_session.add(sku)
+    db_session.flush()
+    return sku
+
+
+def _closure(db_session: Session) -> dict[tuple[int, int], tuple[Decimal, bool]]:
+    rows = db_session.execute(select(SkuBomClosure)).scalars()
+    return {(row.ancestor_sku_id, row.descendant_sku_id): (row.qty, row.is_leaf) for row in rows}
+
+
+def test_multi_level_bom_explodes_through_closure(client: TestClient, db_session: Session) -> None:
+    bouquet = _sku(db_session, "BQT", unit="bunch", is_template=True)
+    posy = _sku(db_session, "POSY", unit="posy")
+    rose = _sku(db_session, "ROSE", unit="stem")
+    wrap = _sku(db_session, "WRAP", unit="sheet")
+    db_session.commit()
+
+    for parent, component, qty in [(bouquet, posy, "2"), (posy, rose, "3"), (posy, wrap, "0.5"), (bouquet, rose, "1")]:
+        response = client.put(f"/skus/{parent.id}/bom", json={"component_sku_id": component.id, "qty": qty})
+        assert response.status_code == 200, response.text
+
+    exploded = client.get(f"/skus/{bouquet.id}/bom/exploded").json()
+    assert [(line["component_code"], line["qty"], line["uom"]) for line in exploded] == [
+        ("ROSE", "7.000", "stem"),
+        ("WRAP", "1.000", "sheet"),
+    ]
+
+    # Editing a sub-assembly updates every kit that uses it.
+    assert client.put(f"/skus/{posy.id}/bom", json={"component_sku_id": rose.id, "qty": "5"}).status_code == 200
+    assert client.delete(f"/skus/{posy.id}/bom/{wrap.id}").status_code == 204
+    exploded = client.get(f"/skus/{bouquet.id}/bom/exploded").json()
+    assert [(line["component_code"], line["qty"]) for line in exploded] == [("ROSE", "11.000")]
+
+    incremental = _closure(db_session)
+    assert incremental[(bouquet.id, posy.id)] == (Decimal("2"), False)
+    assert (posy.id, wrap.id) not in incremental
+    rebuild_bom_closure(db_session.connection())
+    assert _closure(db_session) == incremental
+    db_session.rollback()
+
+    order = {
+        "source": "MANUAL",
+        "customer": {"name": "Kit", "phone": "0977000000"},
+        "receiver": {"name": "Kit", "phone": "0977000000"},
+        "delivery": {"method": "PICKUP", "receive_at_iso": "2030-01-01T10:00:00+00:00"},
+        "items": [{"sku_id": bouquet.id, "qty": 1, "unit_price": 200000}],
+    }
+    response = client.post("/orders", json=order)
+    assert response.status_code == 200, response.text
+    snapshot = response.json()["items"][0]["bom_snapshot"]
+    assert [(line["component_code"], line["qty"]) for line in snapshot] == [("ROSE", "11.000")]
+
+
+def test_direct_bom_edges_keep_their_uom_in_snapshots(client: TestClient, db_session: Session) -> None:
+    bouquet = _sku(db_session, "BQT", unit="bunch", is_template=True)
+    rose = _sku(db_session, "ROSE", unit="stem")
+    db_session.commit()
+    response = client.put(f"/skus/{bouquet.id}/bom", json={"component_sku_id": rose.id, "qty": "0.5", "uom": "bunch"})
+    assert response.status_code == 200, response.text
+
+    exploded = client.get(f"/skus/{bouquet.id}/bom/exploded").json()
+    assert [(line["qty"], line["uom"]) for line in exploded] == [("0.500", "bunch")]
+
+
+def test_closure_follows_edges_expired_before_the_flush(db_session: Session) -> None:
+    bouquet = _sku(db_session, "BQT")
+    rose = _sku(db_session, "ROSE")
+    wrap = _sku(db_session, "WRAP")
+    stems = SkuBom(parent_sku_id=bouquet.id, component_sku_id=rose.id, qty=Decimal("3"))
+    sheets = SkuBom(parent_sku_id=bouquet.id, component_sku_id=wrap.id, qty=Decimal("1"))
+    db_session.add_all([stems, sheets])
+    db_session.commit()
+
+    # Expired edges have no attribute history, so the old values must come from the database.
+    db_session.expire(stems)
+    stems.qty = Decimal("5")
+    db_session.expire(sheets)
+    db_session.delete(sheets)
+    db_session.commit()
+
+    assert _closure(db_session) == {(bouquet.id, rose.id): (Decimal("5"), True)}
+
+
+def test_bom_cycles_are_rejected_on_write(client: TestClient, db_session: Session) -> None:
+    bouquet = _sku(db_session, "BQT")
+    posy = _sku(db_session, "POSY")
+    rose = _sku(db_session, "ROSE")
+    db_session.add_all(
+        [
+            SkuBom(parent_sku_id=bouquet.id, component_sku_id=posy.id, qty=Decimal("1")),
+            SkuBom(parent_sku_id=posy.id, component_sku_id=rose.id, qty=Decimal("1")),
+        ]
+    )
+    db_session.commit()
+
+    response = client.put(f"/skus/{rose.id}/bom", json={"component_sku_id": bouquet.id, "qty": "1"})
+    assert response.status_code == 400
+    assert "cycle" in response.json()["detail"]
+    response = client.put(f"/skus/{posy.id}/bom", json={"component_sku_id": posy.id, "qty": "1"})
+    assert response.status_code == 400
+
+    db_session.add(SkuBom(parent_sku_id=rose.id, component_sku_id=posy.id, qty=Decimal("1")))
+    with pytest.raises(BomCycleError):
+        db_session.flush()
+    db_session.rollback()
+    assert db_session.scalar(select(SkuBom).where(SkuBom.parent_sku_id == rose.id)) is None
+
+
+def test_catalog_cache_reloads_only_after_catalog_writes(client: TestClient, db_session: Session) -> None:
+    rose = _sku(db_session, "ROSE", unit="stem")
+    db_session.commit()
+
+    assert [sku["code"] for sku in client.get("/skus").json()] == ["ROSE"]
+    assert client.get(f"/skus/{rose.id}/bom").json() == []
+    stats = client.get("/skus/catalog-cache").json()
+    assert (stats["hits"], stats["misses"], stats["skus"]) == (1, 1, 1)
+
+    # A write committed elsewhere (here, the fixture session) bumps the shared version.
+    version = stats["version"]
+    rose.name = "Red Rose"
+    db_session.commit()
+    assert client.get("/skus").json()[0]["name"] == "Red Rose"
+    stats = client.get("/skus/catalog-cache").json()
+    assert stats["version"] > version
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert client.get(f"/skus/{rose.id + 1000}/bom").status_code == 404
+
+
+def test_catalog_load_retries_when_a_write_commits_mid_load(
+    client: TestClient, db_session: Session, engine: Engine, async_engine: AsyncEngine
+) -> None:
+    bouquet = _sku(db_session, "BQT", is_template=True)
+    db_session.commit()
+
+    def commit_component(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        # Lands after the SKU rows were read and before the BOM rows are.
+        if "FROM sku_aliases" in statement and not injected:
+            injected.append(statement)
+            with Session(engine) as other:
+                rose = _sku(other, "ROSE", unit="stem")
+                other.add(SkuBom(parent_sku_id=bouquet.id, component_sku_id=rose.id, qty=Decimal("2")))
+                other.commit()
+
+    injected: list[str] = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", commit_component)
+    try:
+        response = client.get(f"/skus/{bouquet.id}/bom")
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", commit_component)
+    assert injected
+    assert response.status_code == 200
+    assert [line["component_code"] for line in response.json()] == ["ROSE"]
+
+
+def test_resolve_ranks_skus_from_free_text(client: TestClient, db_session: Session) -> None:
+    red = _sku(db_session, "BQT-RED", is_template=True)
+    red.name = "Bó hồng đỏ"
+    white = _sku(db_session, "BQT-WHITE", is_template=True)
+    white.name = "Bó hồng trắng"
+    stem = _sku(db_session, "ROSE-RED", unit="stem")
+    stem.name = "Hồng đỏ Ecuador"
+    db_session.commit()
+
+    assert client.post(f"/skus/{red.id}/aliases", json={"alias": "Red rose bouquet"}).status_code == 200
+    response = client.get("/skus/resolve", params={"q": "bó hồng đỏ 20 bông", "is_template": "true"})
+    assert response.status_code == 200
+    candidates = response.json()
+    assert [candidate["code"] for candidate in candidates] == ["BQT-RED", "BQT-WHITE"]
+    assert candidates[0]["matched_field"] == "name"
+    assert candidates[0]["score"] > candidates[1]["score"]
+
+    # The alias added above is part of the index without any explicit refresh.
+    match = client.get("/skus/resolve", params={"q": "red rose bouquet"}).json()[0]
+    assert (match["code"], match["matched_field"], match["score"]) == ("BQT-RED", "alias", 1.0)
+    assert client.get("/skus/resolve", params={"q": "bqt-white"}).json()[0]["matched_field"] == "code"
+    assert client.get("/skus/resolve", params={"q": "xyz"}).json() == []